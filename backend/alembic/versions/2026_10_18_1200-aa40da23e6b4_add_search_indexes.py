@@ -0,0 +1,74 @@
+"""add full-text search to organisations and products
+
+Revision ID: aa40da23e6b4
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "aa40da23e6b4"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept in step with search.models, copied so the migration does not change with the app
+SEARCHABLE_TABLES = {
+    "organisations": {"name": "A", "description": "B"},
+    "products": {"name": "A", "description": "B"},
+}
+LANGUAGE = "english"
+
+
+def search_vector_expression(columns: dict[str, str], row: str) -> str:
+    return " || ".join(
+        f"setweight(to_tsvector('{LANGUAGE}', coalesce({row}.{column}, '')), '{weight}')"
+        for column, weight in columns.items()
+    )
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in SEARCHABLE_TABLES.items():
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        op.execute(
+            f"""CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {search_vector_expression(columns, "NEW")};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql"""
+        )
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(
+            f"""CREATE TRIGGER {table}_search_vector_trigger
+BEFORE INSERT OR UPDATE OF {", ".join(columns)} ON {table}
+FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()"""
+        )
+        # Backfill rows written before the trigger existed
+        op.execute(
+            f"UPDATE {table} SET search_vector = {search_vector_expression(columns, table)} "
+            "WHERE search_vector IS NULL"
+        )
+        op.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_search_vector ON {table} USING gin (search_vector)")
+        op.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_name_trgm ON {table} USING gin (name gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table in SEARCHABLE_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS idx_{table}_name_trgm")
+        op.execute(f"DROP INDEX IF EXISTS idx_{table}_search_vector")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
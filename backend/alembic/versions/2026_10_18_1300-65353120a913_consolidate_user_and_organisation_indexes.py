@@ -0,0 +1,60 @@
+"""replace duplicate user/organisation indexes with partial lower() and active indexes
+
+Revision ID: 65353120a913
+Revises: aa40da23e6b4
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "65353120a913"
+down_revision: Union[str, None] = "aa40da23e6b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # CONCURRENTLY keeps the tables writable while the indexes build, it
+    # cannot run inside the migration transaction. Fails if users already
+    # share an email or username differing only in case, merge those first.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_users_email_lower "
+            "ON users (lower(email)) WHERE is_deleted IS false"
+        )
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_users_username_lower "
+            "ON users (lower(username)) WHERE is_deleted IS false"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_organisations_active_id "
+            "ON organisations (id) WHERE active IS true AND is_deleted IS false"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_user_on_email_username")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_organisation_on_name_description")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_on_email_username "
+            "ON users (email, username) WHERE is_deleted IS false"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_organisation_on_name_description "
+            "ON organisations (name, description) WHERE active IS true"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_organisations_active_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_users_username_lower")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_users_email_lower")
@@ -0,0 +1,66 @@
+"""scope products to organisations, names unique per organisation
+
+Revision ID: 2f0932934efe
+Revises: 65353120a913
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2f0932934efe"
+down_revision: Union[str, None] = "65353120a913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPTIONAL_COLUMNS = {"description": sa.String(), "price": sa.Float(), "unit_of_measure": sa.String()}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    # Every step tolerates a table that create_all already built in the new shape
+    op.execute("ALTER TABLE products ADD COLUMN IF NOT EXISTS organisation_id integer")
+    # Existing products go to the default organisation. Fails below when there
+    # are products but no default organisation, assign them by hand first.
+    op.execute(
+        'UPDATE products SET organisation_id = (SELECT id FROM organisations WHERE "default" IS true ORDER BY id LIMIT 1) '
+        "WHERE organisation_id IS NULL"
+    )
+    op.alter_column("products", "organisation_id", existing_type=sa.Integer(), nullable=False)
+    foreign_keys = sa.inspect(bind).get_foreign_keys("products")
+    if not any(foreign_key["constrained_columns"] == ["organisation_id"] for foreign_key in foreign_keys):
+        op.create_foreign_key(
+            "products_organisation_id_fkey", "products", "organisations", ["organisation_id"], ["id"]
+        )
+    for column, column_type in OPTIONAL_COLUMNS.items():
+        op.alter_column("products", column, existing_type=column_type, nullable=True)
+
+    op.execute("ALTER TABLE products DROP CONSTRAINT IF EXISTS products_name_key")
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_products_organisation_name "
+        "ON products (organisation_id, name) WHERE is_deleted IS false"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_products_organisation_id "
+        "ON products (organisation_id, id) WHERE is_deleted IS false"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.drop_index("idx_products_organisation_id", table_name="products")
+    op.drop_index("uq_products_organisation_name", table_name="products")
+    # Fails when two organisations share a product name
+    op.create_unique_constraint("products_name_key", "products", ["name"])
+    # description, price and unit_of_measure stay nullable, products may lack them now
+    op.drop_constraint("products_organisation_id_fkey", "products", type_="foreignkey")
+    op.drop_column("products", "organisation_id")
@@ -0,0 +1,76 @@
+"""rebuild bookings as product periods that cannot overlap
+
+Revision ID: 7c41d2e9b8a3
+Revises: 2f0932934efe
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c41d2e9b8a3"
+down_revision: Union[str, None] = "2f0932934efe"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_BOOKING = "status != 'Cancelled' AND is_deleted IS false"
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    inspector = sa.inspect(bind)
+    if inspector.has_table("bookings"):
+        columns = {column["name"] for column in inspector.get_columns("bookings")}
+        if "product_id" in columns:
+            # Created by create_all, already in the new shape
+            return
+        # The old rows describe bookable items rather than periods and cannot be
+        # converted, keep them aside for whoever wants to move them by hand
+        op.rename_table("bookings", "bookings_legacy")
+        op.execute("ALTER TABLE bookings_legacy RENAME CONSTRAINT bookings_pkey TO bookings_legacy_pkey")
+        op.execute("ALTER SEQUENCE IF EXISTS bookings_id_seq RENAME TO bookings_legacy_id_seq")
+
+    op.create_table(
+        "bookings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("organisation_id", sa.Integer(), sa.ForeignKey("organisations.id"), nullable=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("start_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("end_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.CheckConstraint("end_at > start_at", name="ck_bookings_end_after_start"),
+        ExcludeConstraint(
+            (sa.column("product_id"), "="),
+            (sa.text("tstzrange(start_at, end_at, '[)')"), "&&"),
+            name="ex_booking_no_overlap",
+            using="gist",
+            where=sa.text(ACTIVE_BOOKING),
+        ),
+    )
+    op.create_index("idx_booking_on_product_period", "bookings", ["product_id", "start_at", "end_at"])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.drop_table("bookings")
+    if sa.inspect(bind).has_table("bookings_legacy"):
+        op.rename_table("bookings_legacy", "bookings")
+        op.execute("ALTER TABLE bookings RENAME CONSTRAINT bookings_legacy_pkey TO bookings_pkey")
+        op.execute("ALTER SEQUENCE IF EXISTS bookings_legacy_id_seq RENAME TO bookings_id_seq")
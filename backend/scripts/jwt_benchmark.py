@@ -0,0 +1,59 @@
+"""Measure access token sign/verify throughput for each supported algorithm.
+
+Keys are generated in memory and loaded into a KeyRing the same way the app
+preloads them, e.g.::
+
+    cd backend
+    python scripts/jwt_benchmark.py --iterations 5000
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from auth.keys import KeyRing, SigningKey  # noqa: E402
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa  # noqa: E402
+
+
+def build_key_rings() -> dict[str, KeyRing]:
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ed25519_key = ed25519.Ed25519PrivateKey.generate()
+    return {
+        "HS256": KeyRing([SigningKey(None, "HS256", "benchmark-secret-" * 2)]),
+        "RS256": KeyRing([SigningKey("rsa-1", "RS256", rsa_key, rsa_key.public_key())]),
+        "EdDSA": KeyRing([SigningKey("ed-1", "EdDSA", ed25519_key, ed25519_key.public_key())]),
+    }
+
+
+def measure(function, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return iterations / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    issued_at = datetime.now(timezone.utc)
+    payload = {
+        "sub": "someone@example.com",
+        "iat": issued_at,
+        "exp": issued_at + timedelta(minutes=30),
+        "user_data": {"user_id": 1, "username": "someone", "email": "someone@example.com"},
+    }
+    for algorithm, key_ring in build_key_rings().items():
+        token = key_ring.encode(payload)
+        signs = measure(lambda: key_ring.encode(payload), args.iterations)
+        verifies = measure(lambda: key_ring.decode(token), args.iterations)
+        print(f"{algorithm:>6}: sign {signs:>9.0f}/s  verify {verifies:>9.0f}/s  token {len(token)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure query throughput and pool checkout wait for different pool sizes.
+
+Runs ``--concurrency`` coroutines issuing ``SELECT pg_sleep(...)`` against the
+configured database for every pool size given, e.g.::
+
+    cd backend
+    python scripts/pool_load_test.py --pool-sizes 5 10 20 40 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from database.config import database_settings  # noqa: E402
+from database.pool import TimedAsyncAdaptedQueuePool, checkout_listeners  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+
+async def run(pool_size: int, *, concurrency: int, duration: float, query_ms: float) -> dict:
+    waits: list[float] = []
+    listener = lambda pool, waited: waits.append(waited)  # noqa: E731
+    checkout_listeners.append(listener)
+
+    engine = create_async_engine(
+        database_settings.DATABASE_URL,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=duration * 2,
+    )
+    statement = text("SELECT pg_sleep(:seconds)")
+    completed = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal completed
+        while time.perf_counter() < deadline:
+            async with engine.connect() as connection:
+                await connection.execute(statement, {"seconds": query_ms / 1000})
+            completed += 1
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await engine.dispose()
+        checkout_listeners.remove(listener)
+
+    waits.sort()
+    return {
+        "pool_size": pool_size,
+        "queries_per_second": completed / elapsed,
+        "p50_wait_ms": statistics.median(waits) * 1000 if waits else 0.0,
+        "p95_wait_ms": waits[int(len(waits) * 0.95) - 1] * 1000 if waits else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[5, 10, 20, 40])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per pool size")
+    parser.add_argument("--query-ms", type=float, default=5.0, help="simulated query time")
+    args = parser.parse_args()
+
+    print(f"{'pool_size':>10} {'queries/s':>12} {'p50 wait ms':>12} {'p95 wait ms':>12}")
+    for pool_size in args.pool_sizes:
+        result = await run(pool_size, concurrency=args.concurrency, duration=args.duration, query_ms=args.query_ms)
+        print(
+            f"{result['pool_size']:>10} {result['queries_per_second']:>12.1f} "
+            f"{result['p50_wait_ms']:>12.2f} {result['p95_wait_ms']:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Compare the batched pricing engine with the previous per-call helpers.
+
+Prices a calendar of ``--slots`` slots for every unit of measure, once with
+``booking.pricing.calculate_prices`` and once the way availability was priced
+before, awaiting an async helper per slot. The old helpers are reproduced
+with their arithmetic corrected (``.days()`` raised, hours returned minutes),
+so only the calling pattern differs, e.g.::
+
+    cd backend
+    python scripts/pricing_benchmark.py --slots 50000
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from booking.pricing import (  # noqa: E402
+    calculate_days,
+    calculate_hours,
+    calculate_minutes,
+    calculate_months,
+    calculate_prices,
+)
+
+PRICE = 12.5
+UNITS = {"minute": timedelta(minutes=15), "hour": timedelta(hours=1), "day": timedelta(days=1), "month": timedelta(days=30)}
+
+
+async def calculate_minutes_per_call(check_in: datetime, check_out: datetime):
+    return calculate_minutes(check_in, check_out)
+
+
+async def calculate_hours_per_call(check_in: datetime, check_out: datetime):
+    return calculate_hours(check_in, check_out)
+
+
+async def calculate_days_per_call(check_in: datetime, check_out: datetime):
+    return calculate_days(check_in, check_out)
+
+
+async def calculate_months_per_call(check_in: datetime, check_out: datetime):
+    return calculate_months(check_in, check_out)
+
+
+PER_CALL_HELPERS = {
+    "minute": calculate_minutes_per_call,
+    "hour": calculate_hours_per_call,
+    "day": calculate_days_per_call,
+    "month": calculate_months_per_call,
+}
+
+
+async def price_per_call(check_ins: list[datetime], check_outs: list[datetime], unit: str) -> list[float]:
+    helper = PER_CALL_HELPERS[unit]
+    prices = []
+    for check_in, check_out in zip(check_ins, check_outs):
+        duration = await helper(check_in, check_out)
+        prices.append(round(math.ceil(round(duration, 6)) * PRICE, 2))
+    return prices
+
+
+def make_slots(slots: int, length: timedelta) -> tuple[list[datetime], list[datetime]]:
+    start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    check_ins = [start + length * i for i in range(slots)]
+    return check_ins, [check_in + length for check_in in check_ins]
+
+
+def best_of(repeat: int, function) -> tuple[float, list[float]]:
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slots", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for unit, length in UNITS.items():
+        check_ins, check_outs = make_slots(args.slots, length)
+        batched, batched_prices = best_of(
+            args.repeat, lambda: calculate_prices(check_ins, check_outs, price=PRICE, unit_of_measure=unit)
+        )
+        per_call, per_call_prices = best_of(
+            args.repeat, lambda: asyncio.run(price_per_call(check_ins, check_outs, unit))
+        )
+        assert batched_prices == per_call_prices, f"{unit}: the two pricings disagree"
+        print(
+            f"{unit:>6}: batched {batched * 1000:8.2f} ms  per call {per_call * 1000:8.2f} ms  "
+            f"{per_call / batched:5.1f}x  ({args.slots} slots)"
+        )
+
+
+if __name__ == "__main__":
+    main()
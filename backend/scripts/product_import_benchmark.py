@@ -0,0 +1,107 @@
+"""Measure bulk product import and export against the configured database.
+
+Creates a throwaway organisation, imports ``--rows`` generated products as
+CSV through the bulk import (``COPY`` on asyncpg), re-imports them as an
+upsert, exports them, and for comparison inserts a sample through the ORM
+one row at a time. Everything is soft deleted afterwards, e.g.::
+
+    cd backend
+    alembic upgrade head
+    python scripts/product_import_benchmark.py --rows 100000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core.enums import FileFormat  # noqa: E402
+from database.core import AsyncSessionLocal, async_engine  # noqa: E402
+from organisation.models import Organisation  # noqa: E402
+from product.models import Product  # noqa: E402
+from product.service import export_products, import_products  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+
+
+def generate_csv(rows: int, chunk_size: int = 64 * 1024) -> list[bytes]:
+    lines = ["name,description,price,unit_of_measure\n"]
+    lines += [f"Product {i},Generated product number {i},{i % 500 + 0.5},hour\n" for i in range(rows)]
+    body = "".join(lines).encode()
+    # Chunked like a streamed request body
+    return [body[start : start + chunk_size] for start in range(0, len(body), chunk_size)]
+
+
+async def as_stream(chunks: list[bytes]):
+    for chunk in chunks:
+        yield chunk
+
+
+async def timed(description: str, rows: int, coroutine) -> None:
+    started = time.perf_counter()
+    result = await coroutine
+    elapsed = time.perf_counter() - started
+    print(f"{description:>28}: {elapsed:8.2f}s  {rows / elapsed:>10.0f} rows/s  {result or ''}")
+
+
+async def orm_insert(organisation_id: int, rows: int) -> None:
+    async with AsyncSessionLocal() as db_session:
+        for i in range(rows):
+            db_session.add(
+                Product(organisation_id=organisation_id, name=f"ORM product {i}", slug=f"orm-product-{i}", price=1.0)
+            )
+            await db_session.commit()
+
+
+async def export_all(organisation_id: int) -> str:
+    size = 0
+    async for part in export_products(organisation_id=organisation_id, file_format=FileFormat.csv):
+        size += len(part)
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--orm-rows", type=int, default=2_000, help="rows for the per-row ORM baseline")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db_session:
+        name = f"benchmark-{uuid4().hex[:8]}"
+        organisation = Organisation(name=name, slug=name, active=True, is_deleted=False)
+        db_session.add(organisation)
+        await db_session.commit()
+        await db_session.refresh(organisation)
+        organisation_id = organisation.id
+
+    chunks = generate_csv(args.rows)
+    try:
+        await timed(
+            "bulk import",
+            args.rows,
+            import_products(organisation_id=organisation_id, chunks=as_stream(chunks), file_format=FileFormat.csv),
+        )
+        await timed(
+            "bulk re-import (upsert)",
+            args.rows,
+            import_products(organisation_id=organisation_id, chunks=as_stream(chunks), file_format=FileFormat.csv),
+        )
+        await timed("streamed CSV export", args.rows, export_all(organisation_id))
+        await timed("ORM insert, row by row", args.orm_rows, orm_insert(organisation_id, args.orm_rows))
+    finally:
+        async with AsyncSessionLocal() as db_session:
+            await db_session.execute(
+                update(Product).where(Product.organisation_id == organisation_id).values(is_deleted=True)
+            )
+            await db_session.execute(
+                update(Organisation).where(Organisation.id == organisation_id).values(is_deleted=True)
+            )
+            await db_session.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""Count the SQL statements and time per request on hot endpoints.
+
+Compares the current pooled-session dependency with the previous one that
+ran ``Base.metadata.create_all`` before handing out every session, against
+the configured database, e.g.::
+
+    cd backend
+    python scripts/request_query_benchmark.py --requests 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core.cache import response_cache  # noqa: E402
+from database.core import (  # noqa: E402
+    AsyncSessionLocal,
+    Base,
+    async_engine,
+    get_async_db,
+    get_async_read_db,
+)
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from main import api, app  # noqa: E402
+
+ENDPOINTS = ["/api/v1/healthcheck", "/api/v1/organisations"]
+
+
+async def create_all_per_request_db():
+    """The dependency as it was, schema checks on every request."""
+    async with async_engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def measure(client: TestClient, path: str, requests: int, counter: StatementCounter) -> tuple[float, float]:
+    client.get(path)  # warm up the pool and caches
+    counter.count = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    elapsed = time.perf_counter() - started
+    return counter.count / requests, elapsed / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    # Cached responses would hide the queries
+    response_cache.enabled = False
+    counter = StatementCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+
+    with TestClient(app) as client:
+        for label, override in (("create_all per request", create_all_per_request_db), ("startup bootstrap", None)):
+            api.dependency_overrides.clear()
+            if override is not None:
+                api.dependency_overrides[get_async_db] = override
+                api.dependency_overrides[get_async_read_db] = override
+            for path in ENDPOINTS:
+                statements, latency = measure(client, path, args.requests, counter)
+                print(f"{label:>24} {path:<24} {statements:6.1f} statements/request  {latency:7.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
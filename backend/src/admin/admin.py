@@ -26,6 +26,10 @@ class ProductAdmin(ModelView, model=Product):
 class BookingAdmin(ModelView, model=Booking):
     column_list = [
         Booking.id,
+        Booking.product_id,
+        Booking.start_at,
+        Booking.end_at,
+        Booking.status,
         Booking.description,
         Booking.created_at,
         Booking.updated_at,
@@ -1,12 +1,20 @@
+import hmac
+from typing import Optional
+
+from auth.hashing import password_hashing_executor
 from auth.routers import auth_router
 from booking.routers import booking_router
 from core.routers import home_router
 from database.core import get_async_db
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Header, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from monitoring.config import monitoring_settings
+from monitoring.metrics import Gauge, registry
 from organisation.routers import organisation_router
 from product.routers import product_router
+from profiling.routers import profiling_router
 from registration.routers import account_router
+from search.routers import search_router
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 api_router = APIRouter(default_response_class=JSONResponse)
@@ -21,6 +29,8 @@ api_router.include_router(auth_router)
 api_router.include_router(organisation_router)
 api_router.include_router(booking_router)
 api_router.include_router(product_router)
+api_router.include_router(profiling_router)
+api_router.include_router(search_router)
 
 # NOTE: Other routers go here below in order
 
@@ -32,6 +42,37 @@ async def healthcheck(
     return JSONResponse(status_code=status.HTTP_200_OK, content={"detail": "STATUS_OK"})
 
 
+registry.register(
+    Gauge(
+        "password_hashing_executor",
+        "Password hashing pool queue depth and counters.",
+        ["state"],
+        lambda: (((state,), value) for state, value in password_hashing_executor.metrics().items()),
+    )
+)
+
+
+@api_router.get(
+    "/metrics",
+    name="metrics",
+    tags=["Healthcheck"],
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Expose request, database and pool metrics in the Prometheus text format."""
+    if not monitoring_settings.METRICS_ENABLED or not monitoring_settings.METRICS_TOKEN:
+        return PlainTextResponse(status_code=status.HTTP_404_NOT_FOUND, content="")
+    expected = f"Bearer {monitoring_settings.METRICS_TOKEN}"
+    if not hmac.compare_digest((authorization or "").encode(), expected.encode()):
+        return PlainTextResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED, content="", headers={"WWW-Authenticate": "Bearer"}
+        )
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # api_router.include_router(authenticated_organisation_api_router, dependencies=[Depends(get_current_user)])
 
 # api_router.include_router(authenticated_api_router, dependencies=[Depends(get_current_user)])
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+from database.redis import get_redis_client
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+
+from .config import auth_settings
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """A small in-process LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, *, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return item[1] if item else None
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        with self._lock:
+            return [(key, value) for key, (_, value) in self._data.items()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class UserCache:
+    """Short lived cache of users keyed by the token subject (email or username).
+
+    Also remembers when a user was invalidated so that tokens issued before a
+    soft-delete or password change are no longer trusted. Revocations are
+    checked in process on every request. They are published to Redis and
+    every worker mirrors the others' on the next sync, every
+    ``sync_interval`` seconds, the same way refresh token families are.
+    """
+
+    def __init__(
+        self, *, ttl: float, max_size: int, revocation_ttl: float, prefix: str, sync_interval: float
+    ):
+        self._users = TTLCache(ttl=ttl, max_size=max_size)
+        self._revoked_at = TTLCache(ttl=revocation_ttl, max_size=max_size)
+        self.revocation_ttl = revocation_ttl
+        self.prefix = prefix
+        self.sync_interval = sync_interval
+        self._publishing: set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def _revoked_bucket_keys(self) -> list[str]:
+        """One set of revocations per day, as many days back as an access token lives."""
+        today = datetime.now(timezone.utc).date()
+        days = math.ceil(self.revocation_ttl / 86400) + 1
+        return [f"{self.prefix}:{today - timedelta(days=day)}" for day in range(days)]
+
+    def get(self, login_identifier: str) -> Optional[User]:
+        return self._users.get(login_identifier)
+
+    def set(self, login_identifier: str, user: User) -> None:
+        self._users.set(login_identifier, snapshot_user(user))
+
+    def is_revoked(self, user_id: int, issued_at: Optional[int]) -> bool:
+        revoked_at = self._revoked_at.get(user_id)
+        if revoked_at is None:
+            return False
+        # Both in whole seconds, a token issued in the second of the revocation is
+        # trusted so that the login right after a password change works
+        return issued_at is None or issued_at < revoked_at
+
+    def _mark_revoked(self, user_id: int, revoked_at: int) -> None:
+        if revoked_at <= (self._revoked_at.get(user_id) or 0):
+            return
+        self._revoked_at.set(user_id, revoked_at)
+        for login_identifier, user in self._users.items():
+            if user.id == user_id:
+                self._users.pop(login_identifier)
+
+    async def _publish_revocation(self, user_id: int, revoked_at: int) -> None:
+        bucket = self._revoked_bucket_keys()[0]
+        try:
+            redis = get_redis_client()
+            await redis.sadd(bucket, f"{user_id}:{revoked_at}")
+            await redis.expire(bucket, int(self.revocation_ttl) + 86400)
+        except RedisError as e:
+            logger.error(f"Could not share the token revocation of user {user_id}: {e}")
+
+    def invalidate_user(self, user_id: int) -> None:
+        revoked_at = int(time.time())
+        self._mark_revoked(user_id, revoked_at)
+        # Called from a flush, which cannot await, so the write to Redis is scheduled
+        try:
+            task = asyncio.get_running_loop().create_task(self._publish_revocation(user_id, revoked_at))
+        except RuntimeError:
+            logger.warning(f"No event loop, the token revocation of user {user_id} stays in this process")
+            return
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    async def sync(self) -> int:
+        """Mirrors the revocations recorded by every worker into this process."""
+        redis = get_redis_client()
+        oldest = time.time() - self.revocation_ttl
+        count = 0
+        for bucket in self._revoked_bucket_keys():
+            for member in await redis.smembers(bucket):
+                member = member.decode() if isinstance(member, bytes) else member
+                user_id, revoked_at = (int(part) for part in member.split(":"))
+                if revoked_at >= oldest:
+                    self._mark_revoked(user_id, revoked_at)
+                    count += 1
+        return count
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Error syncing the user token revocations: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="user-revocation-sync")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._revoked_at.clear()
+
+
+def snapshot_user(user: User) -> User:
+    """Returns a detached copy of the user that is safe to share across sessions."""
+    return User(**{column.key: getattr(user, column.key) for column in User.__table__.c})
+
+
+def user_from_claims(user_data: dict) -> User:
+    """Builds a transient user from the signed ``user_data`` claims of a token."""
+    return User(
+        id=user_data["user_id"],
+        username=user_data.get("username"),
+        email=user_data.get("email"),
+        user_image=user_data.get("image"),
+        is_superuser=bool(user_data.get("is_superuser")),
+        is_deleted=False,
+    )
+
+
+user_cache = UserCache(
+    ttl=auth_settings.USER_CACHE_TTL_SECONDS,
+    max_size=auth_settings.USER_CACHE_MAX_SIZE,
+    revocation_ttl=auth_settings.NEW_ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    prefix=auth_settings.USER_REVOCATION_KEY_PREFIX,
+    sync_interval=auth_settings.USER_REVOCATION_SYNC_SECONDS,
+)
+
+# Google userinfo responses keyed by the sha256 of the access token, never the token itself
+google_userinfo_cache = TTLCache(
+    ttl=auth_settings.GOOGLE_USERINFO_CACHE_TTL_SECONDS,
+    max_size=auth_settings.GOOGLE_USERINFO_CACHE_MAX_SIZE,
+)
+
+
+@event.listens_for(User, "after_update")
+def invalidate_cached_user(mapper, connection, target: User) -> None:
+    """Drops cached copies of a user whose password or deleted state changed."""
+    state = inspect(target)
+    if (
+        state.attrs.password.history.has_changes()
+        or state.attrs.is_deleted.history.has_changes()
+    ):
+        user_cache.invalidate_user(target.id)
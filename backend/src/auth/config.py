@@ -7,10 +7,37 @@ class AuthConfig(BaseSettings):
     #################################### auth related ####################################
     JWT_ACCESS_SECRET_KEY: str = "9d9bc4d77ac3a6fce1869ec8222729d2"
     JWT_REFRESH_SECRET_KEY: str = "fdc5635260b464a0b8e12835800c9016"
+    # HS256 signs with JWT_ACCESS_SECRET_KEY, RS256/EdDSA with the key ring below
     ENCRYPTION_ALGORITHM: str = "HS256"
+    REFRESH_ENCRYPTION_ALGORITHM: str = "HS256"
+    # <kid>.pem private keys and <kid>.pub.pem retired public keys
+    JWT_SIGNING_KEYS_DIR: str = ""
+    # Defaults to the newest private key in JWT_SIGNING_KEYS_DIR
+    JWT_ACTIVE_KEY_ID: str = ""
+    JWT_JWKS_MAX_AGE_SECONDS: int = 60 * 5
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     NEW_ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24
+    # Password hashing, bcrypt runs off the event loop on a bounded pool
+    PASSWORD_HASHING_EXECUTOR: str = "thread"  # thread | process
+    PASSWORD_HASHING_WORKERS: int = 4
+    PASSWORD_HASHING_MAX_PENDING: int = 64
+    # Stateless auth, trust signed token claims instead of loading the user per request
+    STATELESS_AUTH_ENABLED: bool = False
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+    # Shared with every worker, when a user last had their tokens revoked
+    USER_REVOCATION_KEY_PREFIX: str = "entweni:auth:user-revoked"
+    USER_REVOCATION_SYNC_SECONDS: float = 5.0
+    # Last login timestamps are buffered and written in bulk
+    LAST_LOGIN_FLUSH_INTERVAL_SECONDS: float = 5.0
+    LAST_LOGIN_MAX_PENDING: int = 1000
+    # Refresh tokens rotate on use, revoked families are mirrored in a bloom filter
+    REFRESH_TOKEN_STORE_PREFIX: str = "refresh"
+    REFRESH_TOKEN_STORE_RETRY_SECONDS: int = 30
+    REFRESH_DENYLIST_SYNC_SECONDS: float = 10.0
+    REFRESH_DENYLIST_BLOOM_CAPACITY: int = 100_000
+    REFRESH_DENYLIST_BLOOM_ERROR_RATE: float = 0.001
     # Google Auth
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
     GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
@@ -18,6 +45,9 @@ class AuthConfig(BaseSettings):
     GOOGLE_AUTH_URL: str = "https://accounts.google.com/o/oauth2/auth"
     GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
     REDIRECT_URI: str = "http://localhost:8000/api/v1/auth/callback"
+    # Verified userinfo responses, keyed by a hash of the Google access token
+    GOOGLE_USERINFO_CACHE_TTL_SECONDS: int = 300
+    GOOGLE_USERINFO_CACHE_MAX_SIZE: int = 10_000
     # openapi
     # OPENAPI_PROJECT_SECRET_KEY: str
     #################################### auth related ####################################
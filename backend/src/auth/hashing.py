@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from .config import auth_settings
+
+logger = logging.getLogger(__name__)
+
+password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# Module level functions so they can be pickled into a process pool
+def _hash_password(password: str) -> str:
+    return password_context.hash(password)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_context.verify(plain_password, hashed_password)
+
+
+class PasswordHashingExecutor:
+    """Runs password hashing on a bounded worker pool instead of the event loop.
+
+    Requests beyond ``max_pending`` are rejected with a 503 so that a burst of
+    logins cannot queue unbounded work behind the pool.
+    """
+
+    def __init__(self, *, kind: str, max_workers: int, max_pending: int):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hashing"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning(
+                f"Password hashing queue is full ({self.pending} pending), rejecting request"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, func, *args)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        return result
+
+    def metrics(self) -> dict[str, int]:
+        """Returns the current queue depth and throughput counters."""
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "in_flight": min(self.pending, self.max_workers),
+            "queued": max(self.pending - self.max_workers, 0),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hashing_executor = PasswordHashingExecutor(
+    kind=auth_settings.PASSWORD_HASHING_EXECUTOR,
+    max_workers=auth_settings.PASSWORD_HASHING_WORKERS,
+    max_pending=auth_settings.PASSWORD_HASHING_MAX_PENDING,
+)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hashing_executor.run(_hash_password, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hashing_executor.run(
+        _verify_password, plain_password, hashed_password
+    )
+
+
+_dummy_password_hash: Optional[str] = None
+
+
+async def get_dummy_password_hash() -> str:
+    """A hash of a random password, verified against when a login names no user."""
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = await hash_password(secrets.token_urlsafe(32))
+    return _dummy_password_hash
@@ -0,0 +1,135 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+import jwt
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from .config import auth_settings
+
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "EdDSA"}
+
+
+class SigningKey:
+    """A parsed key and the algorithm it signs with, ``public_key`` is None for HMAC secrets."""
+
+    def __init__(self, kid: Optional[str], algorithm: str, private_key: Any, public_key: Any = None):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.private_key = private_key
+        self.public_key = public_key
+
+    @property
+    def verification_key(self) -> Any:
+        return self.public_key if self.public_key is not None else self.private_key
+
+    def to_jwk(self) -> Optional[dict]:
+        if self.public_key is None:
+            return None
+        algorithm = RSAAlgorithm if self.algorithm == "RS256" else OKPAlgorithm
+        jwk = json.loads(algorithm.to_jwk(self.public_key))
+        jwk.update(kid=self.kid, alg=self.algorithm, use="sig")
+        return jwk
+
+
+class KeyRing:
+    """Signs with the active key and verifies with any key in the ring, picked by ``kid``.
+
+    Keys are parsed once, so signing and verifying never touch PEM data.
+    Rotating means adding a new active key and keeping the previous one until
+    the tokens it signed have expired.
+    """
+
+    def __init__(self, keys: list[SigningKey], active_kid: Optional[str] = None):
+        if not keys:
+            raise ValueError("A key ring needs at least one key")
+        self.keys = {key.kid: key for key in keys}
+        if active_kid is not None and active_kid not in self.keys:
+            raise ValueError(f"The active signing key {active_kid} is not in the key ring")
+        self.active = self.keys[active_kid] if active_kid is not None else keys[0]
+        self._jwks: Optional[dict] = None
+
+    def encode(self, payload: dict) -> str:
+        headers = {"kid": self.active.kid} if self.active.kid else None
+        return jwt.encode(payload, self.active.private_key, self.active.algorithm, headers=headers)
+
+    def decode(self, token: str, **options) -> dict:
+        """Verifies the token with the key named in its header, raising ``jwt.InvalidTokenError`` subclasses."""
+        kid = jwt.get_unverified_header(token).get("kid")
+        # Tokens without a kid were issued before the ring, they use the active key
+        key = self.keys.get(kid) if kid is not None else self.active
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key {kid}")
+        return jwt.decode(token, key.verification_key, algorithms=[key.algorithm], **options)
+
+    def jwks(self) -> dict:
+        """Public keys in JWK Set format, symmetric keys are never published."""
+        if self._jwks is None:
+            self._jwks = {"keys": [jwk for key in self.keys.values() if (jwk := key.to_jwk())]}
+        return self._jwks
+
+
+def load_private_key(path: Path) -> SigningKey:
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    private_key = load_pem_private_key(path.read_bytes(), password=None)
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        algorithm = "RS256"
+    elif isinstance(private_key, ed25519.Ed25519PrivateKey):
+        algorithm = "EdDSA"
+    else:
+        raise ValueError(f"Unsupported key type in {path}, use RSA or Ed25519")
+    return SigningKey(path.name.removesuffix(".pem"), algorithm, private_key, private_key.public_key())
+
+
+def load_public_key(path: Path) -> SigningKey:
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+    public_key = load_pem_public_key(path.read_bytes())
+    algorithm = "EdDSA" if isinstance(public_key, ed25519.Ed25519PublicKey) else "RS256"
+    # Retired keys only verify tokens that are still in flight
+    return SigningKey(path.name.removesuffix(".pub.pem"), algorithm, None, public_key)
+
+
+def load_access_key_ring() -> KeyRing:
+    """Builds the access token key ring from the settings.
+
+    For RS256/EdDSA, ``JWT_SIGNING_KEYS_DIR`` holds ``<kid>.pem`` private keys
+    and ``<kid>.pub.pem`` public keys of retired ones. The active key is
+    ``JWT_ACTIVE_KEY_ID`` or else the most recently modified private key.
+    """
+    if auth_settings.ENCRYPTION_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return KeyRing([SigningKey(None, auth_settings.ENCRYPTION_ALGORITHM, auth_settings.JWT_ACCESS_SECRET_KEY)])
+
+    keys_dir = Path(auth_settings.JWT_SIGNING_KEYS_DIR)
+    if not auth_settings.JWT_SIGNING_KEYS_DIR or not keys_dir.is_dir():
+        raise ValueError(
+            f"{auth_settings.ENCRYPTION_ALGORITHM} tokens need JWT_SIGNING_KEYS_DIR pointing at the signing keys"
+        )
+    private_paths = sorted(
+        (path for path in keys_dir.glob("*.pem") if not path.name.endswith(".pub.pem")),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    keys = [load_private_key(path) for path in private_paths]
+    keys += [load_public_key(path) for path in keys_dir.glob("*.pub.pem")]
+    if not private_paths:
+        raise ValueError(f"No private signing key found in {keys_dir}")
+
+    key_ring = KeyRing(keys, active_kid=auth_settings.JWT_ACTIVE_KEY_ID or keys[0].kid)
+    if key_ring.active.private_key is None:
+        raise ValueError(f"The active signing key {key_ring.active.kid} has no private key")
+    logger.info(f"Signing access tokens with {key_ring.active.algorithm} key {key_ring.active.kid}")
+    return key_ring
+
+
+access_key_ring = load_access_key_ring()
+# Refresh tokens never leave this API, they stay on the shared secret
+refresh_key_ring = KeyRing(
+    [SigningKey(None, auth_settings.REFRESH_ENCRYPTION_ALGORITHM, auth_settings.JWT_REFRESH_SECRET_KEY)]
+)
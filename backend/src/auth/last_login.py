@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from database.core import AsyncSessionLocal
+from sqlalchemy import DateTime, Integer, column, update, values
+
+from .config import auth_settings
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """Coalesces last login timestamps in memory and writes them in one bulk UPDATE.
+
+    Flushes every ``flush_interval`` seconds, as soon as ``max_pending`` users
+    are waiting, and once more on shutdown.
+    """
+
+    def __init__(self, *, flush_interval: float, max_pending: int):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: dict[int, datetime] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, user_id: int, logged_in_at: Optional[datetime] = None) -> None:
+        """Remembers the latest login of a user, the write happens on the next flush."""
+        self._pending[user_id] = logged_in_at or datetime.now(timezone.utc)
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+    def _restore(self, pending: dict[int, datetime]) -> None:
+        """Puts unwritten timestamps back unless a newer login was recorded meanwhile."""
+        for user_id, logged_in_at in pending.items():
+            self._pending.setdefault(user_id, logged_in_at)
+
+    async def flush(self) -> int:
+        """Writes every pending timestamp with a single ``UPDATE ... FROM (VALUES ...)``."""
+        if not self._pending:
+            return 0
+
+        pending, self._pending = self._pending, {}
+        last_logins = values(
+            column("id", Integer),
+            column("last_login", DateTime(timezone=True)),
+            name="last_logins",
+        ).data(list(pending.items()))
+        statement = (
+            update(User)
+            .where(User.id == last_logins.c.id)
+            .values(last_login=last_logins.c.last_login)
+            .execution_options(synchronize_session=False)
+        )
+
+        try:
+            async with AsyncSessionLocal() as db_session:
+                await db_session.execute(statement)
+                await db_session.commit()
+        except Exception as e:
+            logger.error(f"Error flushing {len(pending)} last login times: {e}")
+            self._restore(pending)
+            return 0
+        except BaseException:
+            # Cancelled mid-write by stop(), its final flush writes them instead
+            self._restore(pending)
+            raise
+
+        logger.debug(f"Updated last login time for {len(pending)} users")
+        return len(pending)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="last-login-flusher")
+
+    async def stop(self) -> None:
+        """Stops the periodic flush and writes whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+last_login_buffer = LastLoginBuffer(
+    flush_interval=auth_settings.LAST_LOGIN_FLUSH_INTERVAL_SECONDS,
+    max_pending=auth_settings.LAST_LOGIN_MAX_PENDING,
+)
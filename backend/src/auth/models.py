@@ -1,7 +1,7 @@
 from datetime import datetime
 
 from database.core import Base
-from sqlalchemy import Boolean, DateTime, Index, String
+from sqlalchemy import Boolean, DateTime, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -25,19 +25,19 @@ class User(Base):
     def __str__(self):
         return f"{self.username}"
 
-    # Indexes
-    __table_args__ = (
-        Index(
-            "idx_user_on_email_username",
-            "email",
-            "username",
-            postgresql_concurrently=True,
-        ),
-        Index(
-            "idx_user_on_email_username",
-            "email",
-            "username",
-            postgresql_concurrently=True,
-            postgresql_where=(is_deleted.is_(False)),
-        ),
-    )
+
+# Serve the case-insensitive login lookups, only users that are not deleted can log in
+Index(
+    "uq_users_email_lower",
+    func.lower(User.email),
+    unique=True,
+    postgresql_where=User.is_deleted.is_(False),
+    sqlite_where=User.is_deleted.is_(False),
+)
+Index(
+    "uq_users_username_lower",
+    func.lower(User.username),
+    unique=True,
+    postgresql_where=User.is_deleted.is_(False),
+    sqlite_where=User.is_deleted.is_(False),
+)
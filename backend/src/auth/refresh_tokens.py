@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from uuid import uuid4
+
+from database.redis import InMemoryRedis, get_redis_client
+
+from .config import auth_settings
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed size bloom filter, ``in`` never misses an added item but may report false positives."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing, two 64 bit halves of one digest stand in for k hash functions
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RefreshTokenStore:
+    """Tracks refresh token families so tokens rotate on every use and can be revoked.
+
+    A login starts a family. Each refresh consumes the presented ``jti`` and
+    issues a new one in the same family. Presenting an already consumed
+    ``jti`` means the token leaked, so the whole family is revoked.
+
+    Revoked families are mirrored into a bloom filter on every worker, which
+    keeps the revocation check on each authenticated request in memory.
+    Only bloom filter hits are confirmed with the store. Other workers pick up
+    revocations on the next sync, every ``sync_interval`` seconds.
+
+    The store is Redis. While it is unreachable an in-process store is used
+    instead, and reuse detection is skipped because this worker cannot know
+    about tokens issued by the others. Families revoked meanwhile are
+    replayed into Redis by the first sync after it is back.
+    """
+
+    def __init__(self, *, ttl: int, sync_interval: float, capacity: int, error_rate: float):
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.prefix = auth_settings.REFRESH_TOKEN_STORE_PREFIX
+        self._denylist = BloomFilter(capacity, error_rate)
+        # Revoked here since the last sync, kept so a sync cannot drop them
+        self._local_revocations: set[str] = set()
+        # Revoked while Redis was unreachable, not yet visible to the other workers
+        self._pending_revocations: set[str] = set()
+        self._fallback = InMemoryRedis()
+        self._fallback_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def _client(self):
+        if time.monotonic() < self._fallback_until:
+            return self._fallback
+        return get_redis_client()
+
+    def _use_fallback(self, error: Exception) -> None:
+        logger.warning(
+            f"Refresh token store falls back to memory for {auth_settings.REFRESH_TOKEN_STORE_RETRY_SECONDS}s: {error}"
+        )
+        self._fallback_until = time.monotonic() + auth_settings.REFRESH_TOKEN_STORE_RETRY_SECONDS
+
+    async def _call(self, method: str, *args, **kwargs):
+        client = self._client()
+        try:
+            return await getattr(client, method)(*args, **kwargs)
+        except Exception as e:
+            if client is self._fallback:
+                raise
+            self._use_fallback(e)
+            return await getattr(self._fallback, method)(*args, **kwargs)
+
+    def _is_shared(self) -> bool:
+        return not isinstance(self._client(), InMemoryRedis)
+
+    def _token_key(self, jti: str) -> str:
+        return f"{self.prefix}:jti:{jti}"
+
+    def _family_key(self, family: str) -> str:
+        return f"{self.prefix}:family:{family}"
+
+    def _revoked_key(self, family: str) -> str:
+        return f"{self.prefix}:revoked:{family}"
+
+    def _revoked_bucket_keys(self) -> list[str]:
+        """One set of revoked families per day, as many days back as a refresh token lives."""
+        today = datetime.now(timezone.utc).date()
+        days = math.ceil(self.ttl / 86400) + 1
+        return [f"{self.prefix}:revoked-on:{today - timedelta(days=day)}" for day in range(days)]
+
+    async def _register(self, jti: str, family: str) -> None:
+        await self._call("set", self._token_key(jti), family, ex=self.ttl)
+        await self._call("set", self._family_key(family), jti, ex=self.ttl)
+
+    async def issue(self) -> tuple[str, str]:
+        """Starts a new family, returns its first ``(jti, family)``."""
+        jti, family = uuid4().hex, uuid4().hex
+        await self._register(jti, family)
+        return jti, family
+
+    async def rotate(self, jti: str, family: str) -> Optional[str]:
+        """Consumes ``jti`` and returns the next one, or None when the token must be rejected."""
+        if await self.is_revoked(family):
+            return None
+        # Deleting is atomic, of two concurrent refreshes with one token only one wins
+        if not await self._call("delete", self._token_key(jti)):
+            if self._is_shared():
+                logger.warning(f"Refresh token reuse detected, revoking family {family}")
+                await self.revoke_family(family)
+                return None
+        new_jti = uuid4().hex
+        await self._register(new_jti, family)
+        return new_jti
+
+    async def _record_revocation(self, client, family: str) -> None:
+        await client.set(self._revoked_key(family), 1, ex=self.ttl)
+        bucket = self._revoked_bucket_keys()[0]
+        await client.sadd(bucket, family)
+        await client.expire(bucket, self.ttl + 86400)
+        current_jti = await client.get(self._family_key(family))
+        if current_jti is not None:
+            current_jti = current_jti.decode() if isinstance(current_jti, bytes) else current_jti
+            await client.delete(self._token_key(current_jti), self._family_key(family))
+
+    async def revoke_family(self, family: str) -> None:
+        self._denylist.add(family)
+        self._local_revocations.add(family)
+        client = self._client()
+        if client is not self._fallback:
+            try:
+                await self._record_revocation(client, family)
+                return
+            except Exception as e:
+                self._use_fallback(e)
+        self._pending_revocations.add(family)
+        await self._record_revocation(self._fallback, family)
+
+    async def _replay_pending_revocations(self) -> None:
+        """Writes the families revoked while Redis was unreachable into it, once it is back."""
+        if not self._pending_revocations or not self._is_shared():
+            return
+        client = get_redis_client()
+        for family in list(self._pending_revocations):
+            try:
+                await self._record_revocation(client, family)
+            except Exception as e:
+                self._use_fallback(e)
+                return
+            self._pending_revocations.discard(family)
+        logger.info("Replayed the refresh token revocations recorded while Redis was unreachable")
+
+    async def is_revoked(self, family: Optional[str]) -> bool:
+        """In-memory check, the store is only asked when the bloom filter says maybe."""
+        if not family or family not in self._denylist:
+            return False
+        if family in self._pending_revocations:
+            return True
+        return bool(await self._call("exists", self._revoked_key(family)))
+
+    async def sync(self) -> int:
+        """Rebuilds the bloom filter from the revocations recorded by every worker."""
+        await self._replay_pending_revocations()
+        synced = set(self._local_revocations)
+        denylist = BloomFilter(self.capacity, self.error_rate)
+        count = 0
+        # A failed read leaves the local revocations in place for the next sync
+        for bucket in self._revoked_bucket_keys():
+            for family in await self._call("smembers", bucket):
+                denylist.add(family.decode() if isinstance(family, bytes) else family)
+                count += 1
+        # Also those revoked during the reads, or not replayed into Redis yet
+        for family in self._local_revocations | self._pending_revocations:
+            denylist.add(family)
+        self._denylist = denylist
+        self._local_revocations -= synced
+        return count
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Error syncing the refresh token denylist: {e}")
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="refresh-token-denylist-sync")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+refresh_token_store = RefreshTokenStore(
+    ttl=auth_settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60,
+    sync_interval=auth_settings.REFRESH_DENYLIST_SYNC_SECONDS,
+    capacity=auth_settings.REFRESH_DENYLIST_BLOOM_CAPACITY,
+    error_rate=auth_settings.REFRESH_DENYLIST_BLOOM_ERROR_RATE,
+)
@@ -3,11 +3,11 @@ from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
 
 import jwt
+from core.http import get_http_client
 from core.utils import check_accept_header, templates
 from database.core import get_async_db
 from fastapi import (
     APIRouter,
-    BackgroundTasks,
     Cookie,
     Depends,
     HTTPException,
@@ -16,11 +16,13 @@ from fastapi import (
     status,
 )
 from fastapi.responses import JSONResponse, RedirectResponse
-from fastapi_limiter.depends import RateLimiter
-from httpx import AsyncClient
+from ratelimit.depends import RateLimiter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .config import auth_settings
+from .keys import access_key_ring, refresh_key_ring
+from .last_login import last_login_buffer
+from .refresh_tokens import refresh_token_store
 from .schemas import UserLoginSchema
 from .services import (
     authenticate_user,
@@ -28,7 +30,6 @@ from .services import (
     get_current_user,
     get_user_by_email,
     get_user_by_login_identifier,
-    update_user_last_login,
     verify_google_token,
 )
 from .utils import create_access_token, create_refresh_token, set_cookies_and_json
@@ -56,6 +57,19 @@ async def get_me(
     return JSONResponse(content={"data": user_info, "error_message": None})
 
 
+@auth_router.get(
+    "/.well-known/jwks.json",
+    summary="Public keys for verifying access tokens",
+    name="jwks",
+)
+async def jwks():
+    """Publish the access token verification keys, empty when tokens are signed with a shared secret."""
+    return JSONResponse(
+        content=access_key_ring.jwks(),
+        headers={"Cache-Control": f"public, max-age={auth_settings.JWT_JWKS_MAX_AGE_SECONDS}"},
+    )
+
+
 @auth_router.get("/login", summary="Login template frontend", name="sign_in")
 def login_page(
     request: Request, is_template: Optional[bool] = Depends(check_accept_header)
@@ -72,12 +86,11 @@ def login_page(
     "/login/",
     summary="Create access and refresh tokens for user",
     name="login",
-    dependencies=[Depends(RateLimiter(times=5, seconds=60))],
+    dependencies=[Depends(RateLimiter(times=5, seconds=60, identifier_field="login_identifier"))],
 )
 async def login(
     request: Request,
     response: Response,
-    background_tasks: BackgroundTasks,
     db_session: AsyncSession = Depends(get_async_db),
     is_template: Optional[bool] = Depends(check_accept_header),
 ):
@@ -122,17 +135,22 @@ async def login(
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
 
+        refresh_jti, token_family = await refresh_token_store.issue()
         access_token = await create_access_token(
             login_schema.login_identifier,
+            family=token_family,
             user_data={
                 "user_id": user.id,
                 "username": user.username,
                 "email": user.email,
                 "image": user.user_image,
+                "is_superuser": user.is_superuser,
             },
         )
         refresh_token = await create_refresh_token(
             login_schema.login_identifier,
+            jti=refresh_jti,
+            family=token_family,
             user_data={
                 "user_id": user.id,
                 "username": user.username,
@@ -160,7 +178,7 @@ async def login(
             secure=False,  # Adjust for production
         )
 
-        background_tasks.add_task(update_user_last_login, db_session, user=user)
+        last_login_buffer.record(user.id)
 
         if is_template:
             return RedirectResponse(
@@ -174,6 +192,9 @@ async def login(
                 }
             )
 
+    except HTTPException as e:
+        # Includes the 503 from a full password hashing queue
+        raise e
     except Exception as e:
         logger.error(f"Error during login: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -200,44 +221,45 @@ async def callback(request: Request, db_session: AsyncSession = Depends(get_asyn
         raise HTTPException(status_code=400, detail="Authorization code not provided")
 
     try:
-        async with AsyncClient() as client:
-            token_response = await client.post(
-                auth_settings.GOOGLE_TOKEN_URL,
-                data={
-                    "code": code,
-                    "client_id": auth_settings.GOOGLE_CLIENT_ID,
-                    "client_secret": auth_settings.GOOGLE_CLIENT_SECRET,
-                    "redirect_uri": auth_settings.REDIRECT_URI,
-                    "grant_type": "authorization_code",
-                },
+        token_response = await get_http_client().post(
+            auth_settings.GOOGLE_TOKEN_URL,
+            data={
+                "code": code,
+                "client_id": auth_settings.GOOGLE_CLIENT_ID,
+                "client_secret": auth_settings.GOOGLE_CLIENT_SECRET,
+                "redirect_uri": auth_settings.REDIRECT_URI,
+                "grant_type": "authorization_code",
+            },
+        )
+        token_response.raise_for_status()
+        tokens = token_response.json()
+        access_token = tokens["access_token"]
+
+        user_info = await verify_google_token(access_token)
+        if not user_info:
+            raise HTTPException(status_code=400, detail="Invalid token")
+
+        email = user_info.get("email", "").lower()
+        if not email:
+            raise HTTPException(status_code=400, detail="Email was not provided")
+
+        user = await get_user_by_email(db_session=db_session, email=email)
+        if not user:
+            user = await create_user_from_google_credentials(
+                db_session=db_session, **user_info
             )
-            token_response.raise_for_status()
-            tokens = token_response.json()
-            access_token = tokens["access_token"]
-
-            user_info = await verify_google_token(access_token)
-            if not user_info:
-                raise HTTPException(status_code=400, detail="Invalid token")
-
-            email = user_info.get("email", "").lower()
-            if not email:
-                raise HTTPException(status_code=400, detail="Email was not provided")
-
-            user = await get_user_by_email(db_session=db_session, email=email)
-            if not user:
-                user = await create_user_from_google_credentials(
-                    db_session=db_session, **user_info
-                )
-            else:
-                await update_user_last_login(db_session, user=user)
+        last_login_buffer.record(user.id)
 
-            access_token = await create_access_token(email)
-            refresh_token = await create_refresh_token(email)
+        refresh_jti, token_family = await refresh_token_store.issue()
+        access_token = await create_access_token(email, family=token_family)
+        refresh_token = await create_refresh_token(email, jti=refresh_jti, family=token_family)
 
-            response = RedirectResponse(url="/")
-            await set_cookies_and_json(response, access_token, refresh_token)
-            return response
+        response = RedirectResponse(url="/")
+        await set_cookies_and_json(response, access_token, refresh_token)
+        return response
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error during Google OAuth2 callback: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -253,18 +275,22 @@ async def get_new_access_token_from_refresh_token(
 ):
     """Create a new access token from the refresh token."""
     try:
-        payload = jwt.decode(
-            refresh_token,
-            auth_settings.JWT_REFRESH_SECRET_KEY,
-            algorithms=[auth_settings.ENCRYPTION_ALGORITHM],
-        )
+        payload = refresh_key_ring.decode(refresh_token)
         login_identifier = payload.get("sub")
-        if not login_identifier:
+        if not login_identifier or not payload.get("jti") or not payload.get("fam"):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
             )
 
+        # Every refresh token works once, a reused one revokes its whole family
+        token_family = payload["fam"]
+        refresh_jti = await refresh_token_store.rotate(payload["jti"], token_family)
+        if refresh_jti is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked"
+            )
+
         user = await get_user_by_login_identifier(
             db_session, login_identifier=login_identifier
         )
@@ -277,7 +303,22 @@ async def get_new_access_token_from_refresh_token(
             login_identifier,
             expires_delta=timedelta(
                 minutes=auth_settings.NEW_ACCESS_TOKEN_EXPIRE_MINUTES
-            ),  # type: ignore
+            ),
+            family=token_family,
+            user_data={
+                "user_id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "image": user.user_image,
+                "is_superuser": user.is_superuser,
+            },
+        )
+
+        new_refresh_token = await create_refresh_token(
+            login_identifier,
+            jti=refresh_jti,
+            family=token_family,
+            user_data=payload.get("user_data") or {},
         )
 
         response.set_cookie(
@@ -287,6 +328,13 @@ async def get_new_access_token_from_refresh_token(
             samesite="none",
             secure=True,
         )
+        response.set_cookie(
+            key="refresh_token",
+            value=new_refresh_token,
+            httponly=True,
+            samesite="none",
+            secure=True,
+        )
         return "Access token has been successfully refreshed"
 
     except jwt.ExpiredSignatureError:
@@ -314,7 +362,20 @@ async def logout(
     current_user: UserLoginSchema = Depends(get_current_user),
     is_template: Optional[bool] = Depends(check_accept_header),
 ):
-    """Logout the user by removing http-only cookies."""
+    """Logout the user by revoking the token family and removing http-only cookies."""
+    for cookie, key_ring in (("refresh_token", refresh_key_ring), ("access_token", access_key_ring)):
+        token = request.cookies.get(cookie)
+        if not token:
+            continue
+        try:
+            # An expired token may still name a family with live tokens
+            token_family = key_ring.decode(token, options={"verify_exp": False}).get("fam")
+        except jwt.InvalidTokenError:
+            continue
+        if token_family:
+            await refresh_token_store.revoke_family(token_family)
+            break
+
     expires = datetime.now(timezone.utc) + timedelta(seconds=1)
     response.set_cookie(
         key="access_token",
@@ -1,16 +1,21 @@
-import asyncio
+import hashlib
 import logging
 from typing import Optional
 
 import jwt  # PyJWT
+from core.http import get_http_client
 from database.core import get_async_db
 from fastapi import Cookie, Depends, HTTPException, status
-from httpx import AsyncClient, Response
-from sqlalchemy import and_, func, or_, select
+from httpx import Response
+from sqlalchemy import Select, and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .cache import google_userinfo_cache, user_cache, user_from_claims
 from .config import auth_settings
+from .hashing import get_dummy_password_hash
+from .keys import access_key_ring
 from .models import User
+from .refresh_tokens import refresh_token_store
 from .utils import (
     generate_password_hash,
     generate_secure_password,
@@ -32,13 +37,19 @@ async def authenticate_user(
     :param password: The user's password.
     :return: User object if authenticated, otherwise None.
     """
-    await asyncio.sleep(0.1)  # mitigate user enumeration attacks
-
     user = await get_user_by_login_identifier(
         db_session, login_identifier=login_identifier
     )
 
-    if user and await verify_password_hash(
+    if user is None:
+        # Do the same bcrypt work as a real check so the response time does
+        # not reveal whether the user exists (mitigates user enumeration)
+        await verify_password_hash(
+            plain_password=password, hashed_password=await get_dummy_password_hash()
+        )
+        return None
+
+    if await verify_password_hash(
         plain_password=password, hashed_password=user.password
     ):
         return user
@@ -47,6 +58,18 @@ async def authenticate_user(
 
 
 # Get a user with either email or username provided
+def select_user_by_login_identifier(login_identifier: str) -> Select:
+    """Builds the login lookup, matching the partial lower(email)/lower(username) indexes."""
+    login_identifier = login_identifier.lower()
+    return select(User).where(
+        or_(
+            func.lower(User.email) == login_identifier,
+            func.lower(User.username) == login_identifier,
+        ),
+        User.is_deleted.is_(False),
+    )
+
+
 async def get_user_by_login_identifier(
     db_session: AsyncSession, *, login_identifier: str
 ) -> Optional[User]:
@@ -57,10 +80,7 @@ async def get_user_by_login_identifier(
     :param login_identifier: The login identifier, either username or email.
     :return: User object if found, otherwise None.
     """
-    query = select(User).where(
-        or_(User.email == login_identifier, User.username == login_identifier)
-    )
-    result = await db_session.execute(query)
+    result = await db_session.execute(select_user_by_login_identifier(login_identifier))
     return result.scalar_one_or_none()
 
 
@@ -75,12 +95,12 @@ async def get_user_by_email(db_session: AsyncSession, *, email: str) -> Optional
     """
     try:
         query = select(User).where(
-            and_(User.email == email, User.is_deleted.is_(False))
+            and_(func.lower(User.email) == email.lower(), User.is_deleted.is_(False))
         )
         result = await db_session.execute(query)
         return result.scalar_one_or_none()
-    except Exception:
-        logger.debug("Error getting user by email: {e}")
+    except Exception as e:
+        logger.debug(f"Error getting user by email: {e}")
         await db_session.rollback()
 
 
@@ -108,6 +128,7 @@ async def create_user_from_google_credentials(
     )
     db_session.add(user)
     await db_session.commit()
+    await db_session.refresh(user)
     return user
 
 
@@ -119,39 +140,35 @@ async def verify_google_token(google_access_token: str) -> Optional[dict[str, st
     :param google_access_token: Google access token received after sign-in.
     :return: User information dictionary if verified, otherwise None.
     """
-    async with AsyncClient() as client:
-        try:
-            response: Response = await client.get(
-                f"{auth_settings.GOOGLE_USERINFO_URL}?access_token={google_access_token}"
-            )
-            response.raise_for_status()
-            user_info: dict[str, str] = response.json()
-        except Exception as e:
-            logger.error(f"Failed to verify Google token: {e}")
-            return None
+    token_hash = hashlib.sha256(google_access_token.encode()).hexdigest()
+    user_info = google_userinfo_cache.get(token_hash)
+    if user_info is not None:
+        return user_info
+
+    try:
+        response: Response = await get_http_client().get(
+            auth_settings.GOOGLE_USERINFO_URL,
+            headers={"Authorization": f"Bearer {google_access_token}"},
+        )
+        response.raise_for_status()
+        user_info: dict[str, str] = response.json()
+    except Exception as e:
+        logger.error(f"Failed to verify Google token: {e}")
+        return None
 
     if {"email", "given_name", "family_name"}.issubset(user_info):
+        google_userinfo_cache.set(token_hash, user_info)
         return user_info
 
     return None
 
 
-# Update user's last login time
-async def update_user_last_login(db_session: AsyncSession, *, user: User) -> None:
-    """
-    Update the user's last login time.
-
-    :param db_session: Database session for executing queries.
-    :param user: User object to be updated.
-    """
-    try:
-        user.last_login = func.now()
-        db_session.add(user)
-        await db_session.commit()
-        logger.debug(f"Updated last login time for user {user.id}")
-    except Exception as e:
-        logger.error(f"Error updating last login: {e}")
-        await db_session.rollback()
+def raise_revoked_token():
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 
 async def get_current_user(
@@ -166,11 +183,7 @@ async def get_current_user(
         )
 
     try:
-        payload = jwt.decode(
-            access_token,
-            auth_settings.JWT_ACCESS_SECRET_KEY,
-            algorithms=[auth_settings.ENCRYPTION_ALGORITHM],
-        )
+        payload = access_key_ring.decode(access_token)
         login_identifier: str = payload.get("sub")
         if not login_identifier:
             raise HTTPException(
@@ -193,6 +206,27 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if await refresh_token_store.is_revoked(payload.get("fam")):
+        raise_revoked_token()
+
+    user_data: dict = payload.get("user_data") or {}
+    issued_at = payload.get("iat")
+    # Checked before any cache, a cached or stateless user must not outlive a revocation
+    if user_data.get("user_id") and user_cache.is_revoked(user_data["user_id"], issued_at):
+        raise_revoked_token()
+
+    cached_user = user_cache.get(login_identifier)
+    if cached_user is not None:
+        if not user_data.get("user_id") and user_cache.is_revoked(cached_user.id, issued_at):
+            raise_revoked_token()
+        return cached_user
+
+    if auth_settings.STATELESS_AUTH_ENABLED and user_data.get("user_id"):
+        # The claims are signed by us, trust them without a database round trip
+        user = user_from_claims(user_data)
+        user_cache.set(login_identifier, user)
+        return user
+
     user: User | None = await get_user_by_login_identifier(
         db_session, login_identifier=login_identifier
     )
@@ -211,4 +245,18 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if not user_data.get("user_id") and user_cache.is_revoked(user.id, issued_at):
+        raise_revoked_token()
+
+    user_cache.set(login_identifier, user)
+    return user
+
+
+async def get_current_superuser(user: User = Depends(get_current_user)) -> User:
+    if not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator privileges required",
+        )
+
     return user
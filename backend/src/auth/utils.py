@@ -1,51 +1,42 @@
 import secrets
 import string
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import jwt
 from fastapi import HTTPException, Response, status
-from passlib.context import CryptContext
 
 from .config import auth_settings
-
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .hashing import hash_password, verify_password
+from .keys import access_key_ring, refresh_key_ring
 
 
 async def create_access_token(
     login_identifier: str | Any,
-    expires_delta: int = None,
+    expires_delta: Optional[timedelta] = None,
     user_data: dict = {},
+    family: Optional[str] = None,
 ) -> str:
-    if expires_delta is not None:
-        expires_delta = datetime.now(timezone.utc) + timedelta(expires_delta)  # type: ignore
-    else:
-        expires_delta = datetime.now(timezone.utc) + timedelta(
-            minutes=auth_settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+    issued_at = datetime.now(timezone.utc)
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=auth_settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode = {
         "sub": str(login_identifier),
-        "exp": expires_delta,
+        "iat": issued_at,
+        "exp": issued_at + expires_delta,
         "user_data": user_data,
     }
-    encoded_jwt = jwt.encode(
-        to_encode,
-        auth_settings.JWT_ACCESS_SECRET_KEY,
-        auth_settings.ENCRYPTION_ALGORITHM,
-    )
-    return encoded_jwt
+    if family:
+        # Lets a revoked refresh token family cut off its access tokens too
+        to_encode["fam"] = family
+    return access_key_ring.encode(to_encode)
 
 
 async def decode_access_token(token: str) -> dict:
     """Decodes a JWT and returns its payload"""
     try:
-        payload = jwt.decode(
-            token,
-            auth_settings.JWT_ACCESS_SECRET_KEY,
-            [auth_settings.ENCRYPTION_ALGORITHM],
-        )
-        return payload
+        return access_key_ring.decode(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
@@ -57,7 +48,11 @@ async def decode_access_token(token: str) -> dict:
 
 
 async def create_refresh_token(
-    login_identifier: str | Any, expires_delta: float = 0.0, user_data: dict = {}
+    login_identifier: str | Any,
+    expires_delta: Optional[float] = None,
+    user_data: dict = {},
+    jti: Optional[str] = None,
+    family: Optional[str] = None,
 ) -> str:
     if expires_delta is not None:
         expires_delta = datetime.now(timezone.utc) + timedelta(minutes=expires_delta)  # type: ignore
@@ -71,23 +66,15 @@ async def create_refresh_token(
         "exp": expires_delta,
         "user_data": user_data,
     }
-    encoded_jwt = jwt.encode(
-        to_encode,
-        auth_settings.JWT_REFRESH_SECRET_KEY,
-        auth_settings.ENCRYPTION_ALGORITHM,
-    )
-    return encoded_jwt
+    if jti and family:
+        to_encode.update(jti=jti, fam=family)
+    return refresh_key_ring.encode(to_encode)
 
 
 async def decode_refresh_token(token: str) -> dict:
     """Decodes a JWT and returns its payload"""
     try:
-        payload = jwt.decode(
-            token,
-            auth_settings.JWT_REFRESH_SECRET_KEY,
-            [auth_settings.ENCRYPTION_ALGORITHM],
-        )
-        return payload
+        return refresh_key_ring.decode(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
@@ -99,11 +86,11 @@ async def decode_refresh_token(token: str) -> dict:
 
 
 async def generate_password_hash(password: str) -> str:
-    return password_context.hash(password)
+    return await hash_password(password)
 
 
 async def verify_password_hash(plain_password: str, hashed_password: str) -> bool:
-    return password_context.verify(plain_password, hashed_password)
+    return await verify_password(plain_password, hashed_password)
 
 
 async def generate_secure_password(length=20) -> str:
@@ -0,0 +1,16 @@
+from pydantic_settings import BaseSettings
+
+
+class BookingSettings(BaseSettings):
+
+    #################################### availability ####################################
+    # How long a resource's in-memory interval index is trusted before reloading
+    BOOKING_INDEX_TTL_SECONDS: int = 30
+    BOOKING_INDEX_MAX_RESOURCES: int = 10_000
+    # Upper bounds for a single availability query
+    BOOKING_AVAILABILITY_MAX_DAYS: int = 62
+    BOOKING_AVAILABILITY_MAX_SLOTS: int = 10_000
+    #################################### availability ####################################
+
+
+booking_settings = BookingSettings()
@@ -0,0 +1,88 @@
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+class Interval(NamedTuple):
+    start: datetime
+    end: datetime
+    booking_id: int
+
+
+class IntervalIndex:
+    """Half-open ``[start, end)`` intervals of a single resource, kept sorted by start.
+
+    Active bookings of a resource never overlap (the database enforces it), so
+    ordering by start also orders by end and an overlap query only needs a
+    binary search plus a scan over the matches: ``O(log n + k)``.
+    """
+
+    def __init__(self, intervals: Optional[list[Interval]] = None):
+        self._intervals: list[Interval] = sorted(intervals or [])
+        self._starts: list[datetime] = [interval.start for interval in self._intervals]
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def overlapping(self, start: datetime, end: datetime) -> list[Interval]:
+        """Returns the intervals intersecting ``[start, end)``."""
+        # The interval starting right before ``start`` is the only earlier one
+        # that can still be running at ``start``
+        position = max(bisect_right(self._starts, start) - 1, 0)
+        matches = []
+        for interval in self._intervals[position:]:
+            if interval.start >= end:
+                break
+            if interval.end > start:
+                matches.append(interval)
+        return matches
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        return not self.overlapping(start, end)
+
+    def add(self, start: datetime, end: datetime, booking_id: int) -> None:
+        # Anything still overlapping was confirmed by the database to be gone
+        for stale in self.overlapping(start, end):
+            self.remove(stale.booking_id)
+        interval = Interval(start, end, booking_id)
+        position = bisect_right(self._intervals, interval)
+        self._intervals.insert(position, interval)
+        self._starts.insert(position, start)
+
+    def remove(self, booking_id: int) -> None:
+        for position, interval in enumerate(self._intervals):
+            if interval.booking_id == booking_id:
+                del self._intervals[position]
+                del self._starts[position]
+                return
+
+
+class IntervalIndexRegistry:
+    """Per-process LRU of interval indexes keyed by resource ID, reloaded after ``ttl`` seconds."""
+
+    def __init__(self, *, ttl: float, max_resources: int):
+        self.ttl = ttl
+        self.max_resources = max_resources
+        self._indexes: OrderedDict[int, tuple[float, IntervalIndex]] = OrderedDict()
+
+    def get(self, resource_id: int) -> Optional[IntervalIndex]:
+        item = self._indexes.get(resource_id)
+        if item is None:
+            return None
+        loaded_at, index = item
+        if loaded_at + self.ttl < time.monotonic():
+            del self._indexes[resource_id]
+            return None
+        self._indexes.move_to_end(resource_id)
+        return index
+
+    def set(self, resource_id: int, index: IntervalIndex) -> None:
+        self._indexes[resource_id] = (time.monotonic(), index)
+        self._indexes.move_to_end(resource_id)
+        while len(self._indexes) > self.max_resources:
+            self._indexes.popitem(last=False)
+
+    def discard(self, resource_id: int) -> None:
+        self._indexes.pop(resource_id, None)
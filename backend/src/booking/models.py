@@ -1,4 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from core.enums import BookingStatus
 from database.core import Base
+from sqlalchemy import (
+    DDL,
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    and_,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -6,8 +22,55 @@ class Booking(Base):
     __tablename__ = "bookings"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(unique=True)
-    slug: Mapped[str]
-    description: Mapped[str]
-    unit_of_measure: Mapped[str]
+    # the bookable resource
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    organisation_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("organisations.id"), nullable=True
+    )
+    user_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("users.id"), nullable=True
+    )
+    start_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    end_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    status: Mapped[str] = mapped_column(
+        String(20), default=BookingStatus.confirmed.value
+    )
+    description: Mapped[str] = mapped_column(nullable=True)
     # products: Mapped[List["Product"]] = relationship(back_populates="bookings")
+
+    # Indexes
+    __table_args__ = (
+        CheckConstraint("end_at > start_at", name="ck_bookings_end_after_start"),
+        Index("idx_booking_on_product_period", "product_id", "start_at", "end_at"),
+    )
+
+
+# A booking is active until it is cancelled or soft deleted
+ACTIVE_BOOKING = and_(
+    Booking.status != BookingStatus.cancelled.value, Booking.is_deleted.is_(False)
+)
+
+# Postgres refuses overlapping active bookings for the same resource
+Booking.__table__.append_constraint(
+    ExcludeConstraint(
+        (Booking.__table__.c.product_id, "="),
+        (
+            func.tstzrange(
+                Booking.__table__.c.start_at, Booking.__table__.c.end_at, "[)"
+            ),
+            "&&",
+        ),
+        name="ex_booking_no_overlap",
+        using="gist",
+        where=and_(
+            Booking.__table__.c.status != BookingStatus.cancelled.value,
+            Booking.__table__.c.is_deleted.is_(False),
+        ),
+    ).ddl_if(dialect="postgresql")
+)
+
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,100 @@
+import calendar
+import math
+from datetime import datetime
+from typing import Sequence
+
+SECONDS_PER_UNIT = {
+    "minute": 60,
+    "hour": 60 * 60,
+    "day": 60 * 60 * 24,
+}
+
+# Free text units of measure found on products, mapped to a billing unit
+UNIT_ALIASES = {
+    "min": "minute",
+    "mins": "minute",
+    "minute": "minute",
+    "minutes": "minute",
+    "hr": "hour",
+    "hrs": "hour",
+    "hour": "hour",
+    "hours": "hour",
+    "hourly": "hour",
+    "day": "day",
+    "days": "day",
+    "daily": "day",
+    "night": "day",
+    "nights": "day",
+    "month": "month",
+    "months": "month",
+    "monthly": "month",
+}
+
+
+def normalize_unit(unit_of_measure: str) -> str:
+    """Maps a product's unit of measure to minute, hour, day or month."""
+    unit = UNIT_ALIASES.get((unit_of_measure or "").strip().lower())
+    if unit is None:
+        raise ValueError(f"Unsupported unit of measure: {unit_of_measure!r}")
+    return unit
+
+
+def calculate_minutes(check_in: datetime, check_out: datetime) -> float:
+    return (check_out - check_in).total_seconds() / SECONDS_PER_UNIT["minute"]
+
+
+def calculate_hours(check_in: datetime, check_out: datetime) -> float:
+    return (check_out - check_in).total_seconds() / SECONDS_PER_UNIT["hour"]
+
+
+def calculate_days(check_in: datetime, check_out: datetime) -> float:
+    return (check_out - check_in).total_seconds() / SECONDS_PER_UNIT["day"]
+
+
+def calculate_months(check_in: datetime, check_out: datetime) -> float:
+    """Whole calendar months plus the started fraction of the next one."""
+    months = (check_out.year - check_in.year) * 12 + (check_out.month - check_in.month)
+    # Only count a month once its day and time of day have been reached
+    if (check_out.day, check_out.time()) < (check_in.day, check_in.time()):
+        months -= 1
+    anniversary = _add_months(check_in, months)
+    if anniversary == check_out:
+        return float(months)
+    next_anniversary = _add_months(check_in, months + 1)
+    return months + (check_out - anniversary) / (next_anniversary - anniversary)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    year, month = divmod(value.month - 1 + months, 12)
+    year, month = value.year + year, month + 1
+    # Clamp to the last day of shorter months, e.g. Jan 31 + 1 month
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def calculate_durations(
+    check_ins: Sequence[datetime], check_outs: Sequence[datetime], unit_of_measure: str
+) -> list[float]:
+    """Computes the duration of every check-in/check-out pair in ``unit_of_measure``."""
+    if len(check_ins) != len(check_outs):
+        raise ValueError("check_ins and check_outs must have the same length")
+
+    unit = normalize_unit(unit_of_measure)
+    if unit == "month":
+        return [calculate_months(check_in, check_out) for check_in, check_out in zip(check_ins, check_outs)]
+
+    seconds = SECONDS_PER_UNIT[unit]
+    return [(check_out - check_in).total_seconds() / seconds for check_in, check_out in zip(check_ins, check_outs)]
+
+
+def calculate_prices(
+    check_ins: Sequence[datetime],
+    check_outs: Sequence[datetime],
+    *,
+    price: float,
+    unit_of_measure: str,
+) -> list[float]:
+    """Quotes every check-in/check-out pair, charging each started unit in full."""
+    durations = calculate_durations(check_ins, check_outs, unit_of_measure)
+    # Guard against float noise such as 2.0000000001 hours billing as 3
+    return [round(math.ceil(round(duration, 6)) * float(price), 2) for duration in durations]
@@ -1,13 +1,24 @@
+from datetime import datetime
 from typing import Optional
 
+from auth.models import User
+from auth.services import get_current_user
+from core.cache import response_cache
 from core.utils import check_accept_header
-from database.core import get_async_db
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select
+from database.core import get_async_db, get_async_read_db
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import Booking
-from .schemas import BookingCreate
+from .schemas import AvailabilityResponse, BookingCreate, BookingRead, BookingUpdate
+from .services import (
+    cancel_booking,
+    create_booking as create_booking_service,
+    get_all,
+    get_availability,
+    get_by_id_or_raise,
+    is_slot_free,
+    reschedule_booking,
+)
 
 booking_router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
@@ -16,40 +27,101 @@ booking_router = APIRouter(prefix="/bookings", tags=["Bookings"])
 async def list_bookings(
     request: Request,
     is_template: Optional[bool] = Depends(check_accept_header),
-    db: AsyncSession = Depends(get_async_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Get all bookings."""
-    statement = await db.execute(select(Booking))
-    bookings = statement.scalars().all()
-    data = {"bookings": bookings}
-    # data = {}
+
+    async def get_bookings_list():
+        return await get_all(db_session=db)
 
     if is_template:
-        return {"data": data, "error_message": None}
-    return bookings
+        return {"data": {"bookings": await get_bookings_list()}, "error_message": None}
+    return await response_cache.respond(
+        request, namespace="bookings", tags=["bookings"], build=get_bookings_list
+    )
 
 
-@booking_router.post("", name="create_booking")
+@booking_router.post(
+    "",
+    name="create_booking",
+    response_model=BookingRead,
+    status_code=status.HTTP_201_CREATED,
+)
 async def create_booking(
-    request: Request,
     booking: BookingCreate,
-    is_template: Optional[bool] = Depends(check_accept_header),
     db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
 ):
-    return {"detail": "Created a booking with ID [_id]"}
+    """Book a product for a period, 409 if the period is taken."""
+    return await create_booking_service(
+        db_session=db, booking_in=booking, user_id=current_user.id
+    )
 
 
-@booking_router.get("/{booking_id}", name="read_booking")
-async def get_booking_details(id: int):
-    return {"detail": f"Booking Details for a booking with ID:{id}"}
+@booking_router.get(
+    "/availability",
+    name="booking_availability",
+    response_model=AvailabilityResponse,
+)
+async def get_product_availability(
+    product_id: int,
+    start_at: datetime,
+    end_at: datetime,
+    slot_minutes: int = Query(60, ge=5, le=60 * 24),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """List the free and booked slots of a product over a period, e.g. a month."""
+    slots = await get_availability(
+        db_session=db,
+        product_id=product_id,
+        start_at=start_at,
+        end_at=end_at,
+        slot_minutes=slot_minutes,
+    )
+    return {"product_id": product_id, "slots": slots}
+
 
+@booking_router.get("/availability/check", name="booking_slot_check")
+async def check_slot(
+    product_id: int,
+    start_at: datetime,
+    end_at: datetime,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Check whether a single slot is free, answered from the in-memory index."""
+    available = await is_slot_free(
+        db_session=db, product_id=product_id, start_at=start_at, end_at=end_at
+    )
+    return {"product_id": product_id, "available": available}
 
-@booking_router.put("/{booking_id}", name="update_booking")
-async def update_booking(id: int):
-    return {"detail": f"Updated Booking with ID: {id}"}
+
+@booking_router.get("/{booking_id}", name="read_booking", response_model=BookingRead)
+async def get_booking_details(
+    booking_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    return await get_by_id_or_raise(db_session=db, booking_id=booking_id)
+
+
+@booking_router.put("/{booking_id}", name="update_booking", response_model=BookingRead)
+async def update_booking(
+    booking_id: int,
+    booking: BookingUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Reschedule a booking, 403 unless it is yours, 409 if the new period is taken."""
+    return await reschedule_booking(
+        db_session=db, booking_id=booking_id, booking_in=booking, user=current_user
+    )
 
 
 @booking_router.delete("/{booking_id}", name="delete_booking")
-async def delete_booking(id: int):
-    # Adjust all deletes to be soft deletes
-    return {"detail": f"Deleted organisation with ID:{id}"}
+async def delete_booking(
+    booking_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Bookings are cancelled rather than deleted so their history is kept
+    await cancel_booking(db_session=db, booking_id=booking_id, user=current_user)
+    return {"detail": f"Cancelled booking with ID: {booking_id}"}
@@ -1,35 +1,59 @@
-from pydantic import Field, BaseModel
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, model_validator
 
 
 class BookingBase(BaseModel):
-    id: int
-    name: str
+    product_id: int
+    start_at: datetime
+    end_at: datetime
     description: Optional[str] = Field(None)
-    default: Optional[bool] = Field(False)
-    unit_of_measure: Optional[str]
-    slug: Optional[str]
-    # organisation_id: Optional[int]
+
+    @model_validator(mode="after")
+    def check_period(self):
+        if self.end_at <= self.start_at:
+            raise ValueError("end_at must be after start_at")
+        return self
 
 
 class BookingCreate(BookingBase):
     pass
 
 
-# class BookingUpdate(CustomBaseModel):
-#     description: Optional[str] = Field(None, nullable=True)
-#     default: Optional[bool] = Field(False, nullable=True)
-#     # banner_enabled: Optional[bool] = Field(False, nullable=True)
-#     # banner_color: Optional[str] = Field(None, nullable=True)
-#     # banner_text: Optional[NameStr] = Field(None, nullable=True)
+class BookingUpdate(BaseModel):
+    start_at: datetime
+    end_at: datetime
+    description: Optional[str] = Field(None)
+
+    @model_validator(mode="after")
+    def check_period(self):
+        if self.end_at <= self.start_at:
+            raise ValueError("end_at must be after start_at")
+        return self
 
 
 class BookingRead(BookingBase):
-    id: Optional[int]
-    slug: Optional[str]
-    name: Optional[str]
-    description: str
+    id: int
+    organisation_id: Optional[int]
+    user_id: Optional[int]
+    status: str
+
+    class Config:
+        from_attributes = True
+
+
+class AvailabilitySlot(BaseModel):
+    start_at: datetime
+    end_at: datetime
+    available: bool
+    price: Optional[float] = Field(None)
+
+
+class AvailabilityResponse(BaseModel):
+    product_id: int
+    slots: List[AvailabilitySlot]
 
 
 # class BookingPagination(Pagination):
-#     items: List[BookingRead] = []
\ No newline at end of file
+#     items: List[BookingRead] = []
@@ -1,18 +1,285 @@
-from datetime import datetime, timedelta
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
+from auth.models import User
+from core.cache import response_cache
+from core.enums import BookingStatus
+from fastapi import HTTPException, status
+from product.models import Product
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-async def calculate_minutes(check_in: datetime, check_out: datetime):
-    minutes: int = (check_out - check_in).seconds / 60 
-    return minutes
+from .config import booking_settings
+from .intervals import Interval, IntervalIndex, IntervalIndexRegistry
+from .pricing import calculate_prices
+from .models import ACTIVE_BOOKING, Booking
+from .schemas import BookingCreate, BookingUpdate
 
-async def calculate_hours(check_in: datetime, check_out: datetime):
-    hours: int = await calculate_minutes(check_in, check_out)
-    return hours
+logger = logging.getLogger(__name__)
 
-async def calculate_days(check_in: datetime, check_out: datetime):
-    days: int = (check_out - check_in).days()
-    return days
+# Postgres SQLSTATE raised by the no-overlap exclusion constraint
+EXCLUSION_VIOLATION = "23P01"
+
+booking_indexes = IntervalIndexRegistry(
+    ttl=booking_settings.BOOKING_INDEX_TTL_SECONDS,
+    max_resources=booking_settings.BOOKING_INDEX_MAX_RESOURCES,
+)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treats naive datetimes as UTC so they compare with stored timestamps."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def overlaps(start_at: datetime, end_at: datetime):
+    """Filters active bookings intersecting the half-open ``[start_at, end_at)`` period."""
+    return and_(ACTIVE_BOOKING, Booking.start_at < end_at, Booking.end_at > start_at)
+
+
+async def get_interval_index(*, db_session: AsyncSession, product_id: int) -> IntervalIndex:
+    """Returns the in-memory index of upcoming bookings for a product, loading it if stale."""
+    index = booking_indexes.get(product_id)
+    if index is None:
+        query = select(Booking.start_at, Booking.end_at, Booking.id).where(
+            Booking.product_id == product_id,
+            ACTIVE_BOOKING,
+            Booking.end_at > datetime.now(timezone.utc),
+        )
+        result = await db_session.execute(query)
+        # SQLite returns naive datetimes, callers compare with aware ones
+        index = IntervalIndex(
+            [Interval(as_utc(start), as_utc(end), booking_id) for start, end, booking_id in result.all()]
+        )
+        booking_indexes.set(product_id, index)
+    return index
+
+
+async def is_slot_free(
+    *, db_session: AsyncSession, product_id: int, start_at: datetime, end_at: datetime
+) -> bool:
+    """Checks a slot against the in-memory index, the database stays authoritative on writes."""
+    start_at, end_at = as_utc(start_at), as_utc(end_at)
+    if end_at <= datetime.now(timezone.utc):
+        # Past bookings are not indexed
+        result = await db_session.execute(
+            select(Booking.id).where(Booking.product_id == product_id, overlaps(start_at, end_at)).limit(1)
+        )
+        return result.first() is None
+    index = await get_interval_index(db_session=db_session, product_id=product_id)
+    return index.is_free(start_at, end_at)
+
+
+async def get_all(*, db_session: AsyncSession) -> List[Booking]:
+    """Gets all bookings."""
+    result = await db_session.execute(select(Booking).order_by(Booking.id))
+    return result.scalars().all()
+
+
+async def get_by_id(*, db_session: AsyncSession, booking_id: int) -> Booking | None:
+    """Gets a booking by its ID."""
+    query = select(Booking).where(Booking.id == booking_id, Booking.is_deleted.is_(False))
+    result = await db_session.execute(query)
+    return result.scalar_one_or_none()
+
+
+async def get_by_id_or_raise(*, db_session: AsyncSession, booking_id: int) -> Booking:
+    """Returns the booking or raises HTTPException."""
+    booking = await get_by_id(db_session=db_session, booking_id=booking_id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return booking
+
+
+def _raise_unless_owner(*, booking: Booking, user: User) -> None:
+    """Only the user who made a booking, or a superuser, may change it."""
+    if booking.user_id != user.id and not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to change this booking")
+
+
+async def _raise_if_taken(
+    *,
+    db_session: AsyncSession,
+    product_id: int,
+    start_at: datetime,
+    end_at: datetime,
+    exclude_booking_id: Optional[int] = None,
+) -> None:
+    """Rejects the period early when it is already booked.
+
+    A hit in the index is confirmed with the database, the booking may have
+    been cancelled or moved on another worker since the index was loaded.
+    """
+    index = await get_interval_index(db_session=db_session, product_id=product_id)
+    index_conflicts = [
+        interval
+        for interval in index.overlapping(start_at, end_at)
+        if interval.booking_id != exclude_booking_id
+    ]
+    # Without the exclusion constraint the database has to be asked every time
+    if not index_conflicts and db_session.bind.dialect.name == "postgresql":
+        return
+    query = select(Booking.id).where(Booking.product_id == product_id, overlaps(start_at, end_at))
+    if exclude_booking_id is not None:
+        query = query.where(Booking.id != exclude_booking_id)
+    conflicts = (await db_session.execute(query.limit(1))).all()
+    if index_conflicts and not conflicts:
+        booking_indexes.discard(product_id)
+    if conflicts:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="The requested period is already booked"
+        )
+
+
+async def _commit_booking(*, db_session: AsyncSession, booking: Booking) -> Booking:
+    """Commits the booking, mapping exclusion violations to a 409."""
+    # The rollback expires the booking, reading it afterwards would lazy load
+    product_id = booking.product_id
+    try:
+        db_session.add(booking)
+        await db_session.commit()
+    except IntegrityError as e:
+        await db_session.rollback()
+        if getattr(e.orig, "sqlstate", None) == EXCLUSION_VIOLATION:
+            # Another worker took the slot, our index is out of date
+            booking_indexes.discard(product_id)
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="The requested period is already booked"
+            )
+        raise
+    await db_session.refresh(booking)
+    await response_cache.invalidate("bookings")
+    return booking
+
+
+async def create_booking(
+    *, db_session: AsyncSession, booking_in: BookingCreate, user_id: Optional[int] = None
+) -> Booking:
+    """Books a product for the requested period."""
+    product = await db_session.get(Product, booking_in.product_id)
+    if product is None or product.is_deleted:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    start_at, end_at = as_utc(booking_in.start_at), as_utc(booking_in.end_at)
+    await _raise_if_taken(db_session=db_session, product_id=product.id, start_at=start_at, end_at=end_at)
+
+    booking = Booking(
+        product_id=product.id,
+        # Always the product's organisation, clients cannot book across catalogues
+        organisation_id=product.organisation_id,
+        user_id=user_id,
+        start_at=start_at,
+        end_at=end_at,
+        description=booking_in.description,
+        status=BookingStatus.confirmed.value,
+    )
+    booking = await _commit_booking(db_session=db_session, booking=booking)
+
+    index = await get_interval_index(db_session=db_session, product_id=booking.product_id)
+    index.add(as_utc(booking.start_at), as_utc(booking.end_at), booking.id)
+    return booking
+
+
+async def reschedule_booking(
+    *, db_session: AsyncSession, booking_id: int, booking_in: BookingUpdate, user: User
+) -> Booking:
+    """Moves a booking to a new period."""
+    booking = await get_by_id_or_raise(db_session=db_session, booking_id=booking_id)
+    _raise_unless_owner(booking=booking, user=user)
+    if booking.status == BookingStatus.cancelled.value:
+        raise HTTPException(status_code=400, detail="Cancelled bookings cannot be rescheduled")
+
+    start_at, end_at = as_utc(booking_in.start_at), as_utc(booking_in.end_at)
+    await _raise_if_taken(
+        db_session=db_session,
+        product_id=booking.product_id,
+        start_at=start_at,
+        end_at=end_at,
+        exclude_booking_id=booking.id,
+    )
+
+    booking.start_at, booking.end_at = start_at, end_at
+    if booking_in.description is not None:
+        booking.description = booking_in.description
+    booking = await _commit_booking(db_session=db_session, booking=booking)
+
+    index = await get_interval_index(db_session=db_session, product_id=booking.product_id)
+    index.remove(booking.id)
+    index.add(as_utc(booking.start_at), as_utc(booking.end_at), booking.id)
+    return booking
+
+
+async def cancel_booking(*, db_session: AsyncSession, booking_id: int, user: User) -> Booking:
+    """Cancels a booking, freeing its period."""
+    booking = await get_by_id_or_raise(db_session=db_session, booking_id=booking_id)
+    _raise_unless_owner(booking=booking, user=user)
+    booking.status = BookingStatus.cancelled.value
+    booking = await _commit_booking(db_session=db_session, booking=booking)
+
+    index = booking_indexes.get(booking.product_id)
+    if index is not None:
+        index.remove(booking.id)
+    return booking
+
+
+async def get_availability(
+    *,
+    db_session: AsyncSession,
+    product_id: int,
+    start_at: datetime,
+    end_at: datetime,
+    slot_minutes: int,
+) -> list[dict]:
+    """Splits the period into slots, flags the free ones using a single query and prices them."""
+    start_at, end_at = as_utc(start_at), as_utc(end_at)
+    if end_at <= start_at:
+        raise HTTPException(status_code=400, detail="end_at must be after start_at")
+    if end_at - start_at > timedelta(days=booking_settings.BOOKING_AVAILABILITY_MAX_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Availability can be requested for at most {booking_settings.BOOKING_AVAILABILITY_MAX_DAYS} days",
+        )
+    slot_length = timedelta(minutes=slot_minutes)
+    if (end_at - start_at) / slot_length > booking_settings.BOOKING_AVAILABILITY_MAX_SLOTS:
+        raise HTTPException(status_code=400, detail="Too many slots requested, use a larger slot size")
+    product = await db_session.get(Product, product_id)
+    if product is None or product.is_deleted:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    query = (
+        select(Booking.start_at, Booking.end_at)
+        .where(Booking.product_id == product_id, overlaps(start_at, end_at))
+        .order_by(Booking.start_at)
+    )
+    bookings = [(as_utc(start), as_utc(end)) for start, end in (await db_session.execute(query)).all()]
+
+    # Sweep the slots and the sorted bookings together
+    slots = []
+    position = 0
+    slot_start = start_at
+    while slot_start < end_at:
+        slot_end = min(slot_start + slot_length, end_at)
+        while position < len(bookings) and bookings[position][1] <= slot_start:
+            position += 1
+        available = position == len(bookings) or bookings[position][0] >= slot_end
+        slots.append({"start_at": slot_start, "end_at": slot_end, "available": available})
+        slot_start = slot_end
+
+    if product.price is not None:
+        try:
+            prices = calculate_prices(
+                [slot["start_at"] for slot in slots],
+                [slot["end_at"] for slot in slots],
+                price=product.price,
+                unit_of_measure=product.unit_of_measure,
+            )
+        except ValueError as e:
+            logger.warning(f"Could not price product {product_id}: {e}")
+        else:
+            for slot, price in zip(slots, prices):
+                slot["price"] = price
+    return slots
 
-async def calculate_months(check_in: datetime, check_out: datetime):
-    months: int = (check_out.year - check_in.year) * 12 + (check_out.month - check_in.month)
-    return months
\ No newline at end of file
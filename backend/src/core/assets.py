@@ -0,0 +1,149 @@
+"""Fingerprinted, precompressed static assets.
+
+Build the assets before starting the app, e.g. as part of the deploy::
+
+    cd backend/src
+    python -m core.assets
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import stat
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Optional
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from jinja2 import pass_context
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+
+from core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# Folders under STATIC_DIR that are published as assets
+ASSET_DIRS = ("bootstrap", "css", "images")
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".map", ".svg", ".txt", ".json", ".html", ".xml", ".ico"}
+# Compressing tiny files costs more in headers than it saves
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={settings.STATIC_CACHE_MAX_AGE}, immutable"
+
+
+def fingerprint(path: Path, content: bytes) -> str:
+    """Returns ``name.<hash>.ext`` for the file content."""
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    return f"{path.stem}.{digest}{path.suffix}"
+
+
+def write_compressed(path: Path, content: bytes) -> None:
+    """Writes ``.gz`` and, when brotli is installed, ``.br`` siblings next to the file."""
+    # mtime=0 keeps the output identical between builds
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(content, quality=11))
+
+
+def build_assets(source_dir: str = settings.STATIC_DIR, output_dir: str = settings.STATIC_DIST_DIR) -> dict[str, str]:
+    """Copies the assets to ``output_dir`` under fingerprinted names and writes the manifest."""
+    source, output = Path(source_dir).resolve(), Path(output_dir).resolve()
+    # User uploads change at runtime and are linked directly
+    excluded = (output, Path(settings.USER_IMAGE_DIR).resolve())
+    if output.exists():
+        shutil.rmtree(output)
+    output.mkdir(parents=True)
+
+    manifest = {}
+    for asset_dir in ASSET_DIRS:
+        for path in sorted((source / asset_dir).rglob("*")):
+            if not path.is_file() or any(directory in path.parents for directory in excluded):
+                continue
+            relative = path.relative_to(source)
+            content = path.read_bytes()
+            hashed = relative.with_name(fingerprint(relative, content))
+            target = output / hashed
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+            if path.suffix.lower() in COMPRESSIBLE_SUFFIXES and len(content) >= MIN_COMPRESS_SIZE:
+                write_compressed(target, content)
+            manifest[relative.as_posix()] = hashed.as_posix()
+
+    (output / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    logger.info(f"Built {len(manifest)} assets into {output} (brotli {'on' if brotli else 'off'})")
+    return manifest
+
+
+class AssetManifest:
+    """Maps asset paths to their fingerprinted names, loaded on first use."""
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self._entries: Optional[dict[str, str]] = None
+
+    def get(self, path: str) -> Optional[str]:
+        if self._entries is None:
+            self.reload()
+        return self._entries.get(path.lstrip("/"))
+
+    def reload(self):
+        try:
+            with open(self.manifest_path) as manifest_file:
+                self._entries = json.load(manifest_file)
+        except (OSError, ValueError):
+            # Not built, templates fall back to the unversioned files
+            self._entries = {}
+
+
+asset_manifest = AssetManifest(os.path.join(settings.STATIC_DIST_DIR, MANIFEST_NAME))
+
+
+@pass_context
+def static_url(context, path: str) -> str:
+    """Template helper returning the fingerprinted URL of an asset when it was built."""
+    request = context["request"]
+    hashed = asset_manifest.get(path)
+    if hashed is None:
+        return str(request.url_for("static", path=path.lstrip("/")))
+    return str(request.url_for("static_dist", path=hashed))
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """Serves the ``.br``/``.gz`` variant of a file when the client accepts it.
+
+    Every file is fingerprinted so responses can be cached forever.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        response = None
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding not in accept_encoding:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                response = self.file_response(full_path, stat_result, scope)
+                response.headers["Content-Type"] = guess_type(path)[0] or "text/plain"
+                response.headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = await super().get_response(path, scope)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    build_assets()
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from database.config import database_settings
+from database.redis import get_redis_client
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Caches serialized JSON responses in Redis, grouped by invalidation tags."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        expiration_seconds: int,
+        invalidation_grace_seconds: int = 0,
+        prefix: str = "entweni:cache",
+    ):
+        self.enabled = enabled
+        self.expiration_seconds = expiration_seconds
+        self.invalidation_grace_seconds = invalidation_grace_seconds
+        self.prefix = prefix
+
+    def key_for(self, request: Request, *, namespace: str) -> str:
+        """Builds a cache key from the path and the sorted query parameters."""
+        query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+        return f"{self.prefix}:{namespace}:{request.url.path}?{query}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def _invalidated_key(self, tag: str) -> str:
+        return f"{self.prefix}:invalidated:{tag}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        try:
+            return await get_redis_client().get(key)
+        except RedisError as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+    async def set(self, key: str, body: bytes, *, tags: Iterable[str]) -> None:
+        if not self.enabled:
+            return
+        redis = get_redis_client()
+        try:
+            # A read replica may still serve the data from before a recent write
+            if self.invalidation_grace_seconds and await redis.exists(
+                *(self._invalidated_key(tag) for tag in tags)
+            ):
+                return
+            await redis.set(key, body, ex=self.expiration_seconds)
+            for tag in tags:
+                await redis.sadd(self._tag_key(tag), key)
+                await redis.expire(self._tag_key(tag), self.expiration_seconds)
+        except RedisError as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drops every cached response carrying any of the given tags."""
+        if not self.enabled:
+            return
+        redis = get_redis_client()
+        try:
+            for tag in tags:
+                if self.invalidation_grace_seconds:
+                    await redis.set(
+                        self._invalidated_key(tag), 1, ex=self.invalidation_grace_seconds
+                    )
+                keys = await redis.smembers(self._tag_key(tag))
+                await redis.delete(self._tag_key(tag), *keys)
+        except RedisError as e:
+            logger.error(f"Response cache invalidation failed for {tags}: {e}")
+
+    async def respond(
+        self,
+        request: Request,
+        *,
+        namespace: str,
+        tags: Iterable[str],
+        build: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """Serves a cached JSON body, or builds and caches it, honouring If-None-Match."""
+        key = self.key_for(request, namespace=namespace)
+        body = await self.get(key)
+        if body is None:
+            content = await build()
+            body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+            await self.set(key, body, tags=tags)
+
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = {
+            value.strip().removeprefix("W/")
+            for value in request.headers.get("if-none-match", "").split(",")
+        }
+        if etag in if_none_match or "*" in if_none_match:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache(
+    enabled=database_settings.REDIS_CACHE_ENABLED,
+    expiration_seconds=database_settings.REDIS_CACHE_EXPIRATION_SECONDS,
+    invalidation_grace_seconds=(
+        database_settings.REDIS_CACHE_INVALIDATION_GRACE_SECONDS
+        if database_settings.DATABASE_REPLICA_URLS
+        else 0
+    ),
+)
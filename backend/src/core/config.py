@@ -29,8 +29,40 @@ class GlobalSettings(BaseSettings):
     )
     STATIC_DIR: str = DEFAULT_STATIC_DIR
     TEMPLATE_DIR: str = path.join(STATIC_DIR, "templates")
+    # Fingerprinted and precompressed copies written by ``python -m core.assets``
+    STATIC_DIST_DIR: str = path.join(STATIC_DIR, "dist")
+    STATIC_CACHE_MAX_AGE: int = 60 * 60 * 24 * 365
     #################################### static files ####################################
 
+    #################################### templates ####################################
+    TEMPLATE_AUTO_RELOAD: bool = True
+    # Persists compiled templates across restarts
+    TEMPLATE_BYTECODE_CACHE: bool = False
+    # A directory only the app can write to, empty uses Jinja2's private per-user temp directory
+    TEMPLATE_BYTECODE_CACHE_DIR: str = ""
+    TEMPLATE_PRECOMPILE_ON_STARTUP: bool = False
+    # Default lifetime of {% cache %} fragments, 0 renders them every time
+    TEMPLATE_FRAGMENT_CACHE_TTL_SECONDS: int = 0
+    #################################### templates ####################################
+
+    #################################### http client ####################################
+    HTTP_CLIENT_HTTP2: bool = True
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 10.0
+    HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    # Only failed connection attempts are retried
+    HTTP_CLIENT_RETRIES: int = 2
+    #################################### http client ####################################
+
+    #################################### uploads ####################################
+    USER_IMAGE_DIR: str = path.join(STATIC_DIR, "images", "users")
+    USER_IMAGE_MAX_SIZE: int = 1024 * 1024 * 5  # 5 megabytes
+    USER_IMAGE_THUMBNAIL_SIZE: int = 256
+    IMAGE_PROCESSING_WORKERS: int = 2
+    #################################### uploads ####################################
+
 
 class TestSettings(GlobalSettings):
     DATABASE_SCHEMA: str = f"test_{randint(1, 100)}"
@@ -48,6 +80,11 @@ class ProductionSettings(GlobalSettings):
 
     LOG_LEVEL: int = logging.INFO
 
+    TEMPLATE_AUTO_RELOAD: bool = False
+    TEMPLATE_BYTECODE_CACHE: bool = True
+    TEMPLATE_PRECOMPILE_ON_STARTUP: bool = True
+    TEMPLATE_FRAGMENT_CACHE_TTL_SECONDS: int = 60 * 60
+
     @staticmethod
     def get_aws_client_for_image_upload():
         if all(
@@ -18,8 +18,15 @@ class SearchTypes(EntweniBookingEnum):
     query = "Query"
     service = "Service"
     individual_contact = "IndividualContact"
+    organisation = "Organisation"
+    product = "Product"
     
     
+class BookingStatus(EntweniBookingEnum):
+    confirmed = "Confirmed"
+    cancelled = "Cancelled"
+
+
 class UserRoles(EntweniBookingEnum):
     owner = "Owner"
     manager = "Manager"
@@ -31,4 +38,8 @@ class AccountType(Enum):
     SUPERUSER = 'super_user'
     AGENT = 'agent'
     CUSTOMER = 'customer'
-    ORGANISATION = "organisation"
\ No newline at end of file
+    ORGANISATION = "organisation"
+
+class FileFormat(EntweniBookingEnum):
+    csv = "csv"
+    ndjson = "ndjson"
@@ -0,0 +1,89 @@
+import logging
+import os
+from collections import OrderedDict
+
+from fastapi import Request
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import Response
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from core.config import settings
+from core.utils import templates
+
+logger = logging.getLogger(__name__)
+
+ERROR_TEMPLATES = {404: "404.html", 500: "500.html"}
+ERROR_MESSAGES = {404: "Not Found", 500: "Internal Server Error"}
+DEFAULT_LOCALE = "en"
+# Error pages are rendered for this host, never resolvable, see ErrorPageCache
+PLACEHOLDER_HOST = "error-page.invalid"
+
+
+def get_locale(request: Request) -> str:
+    """Returns the primary language tag of the Accept-Language header."""
+    accept_language = request.headers.get("Accept-Language", "")
+    locale = accept_language.split(",", 1)[0].split(";", 1)[0].split("-", 1)[0].strip().lower()
+    # Anything unusual falls back to the default so clients cannot grow the cache
+    return locale if locale.isalpha() and len(locale) <= 3 else DEFAULT_LOCALE
+
+
+class ErrorPageCache:
+    """Keeps rendered error pages as encoded bytes, least recently used first out.
+
+    Pages are keyed by template, locale and template mtime. ``url_for`` bakes
+    the client controlled Host into the links, so pages are rendered for a
+    placeholder host and the request's base URL is swapped in when served.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._pages: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def _template_mtime(self, name: str) -> float:
+        try:
+            return os.stat(os.path.join(settings.TEMPLATE_DIR, name)).st_mtime
+        except OSError:
+            return 0.0
+
+    def render(self, request: Request, status_code: int) -> Response:
+        name = ERROR_TEMPLATES[status_code]
+        locale = get_locale(request)
+        key = (name, locale, self._template_mtime(name))
+        placeholder_request = Request(
+            {**request.scope, "scheme": "http", "headers": [(b"host", PLACEHOLDER_HOST.encode())]}
+        )
+        content = self._pages.get(key)
+        if content is None:
+            template = templates.get_template(name)
+            content = template.render(
+                request=placeholder_request,
+                data={},
+                locale=locale,
+                error_message=ERROR_MESSAGES[status_code],
+            ).encode("utf-8")
+            self._pages[key] = content
+            while len(self._pages) > self.max_size:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(key)
+        content = content.replace(
+            str(placeholder_request.base_url).encode(), str(request.base_url).encode()
+        )
+        return Response(content=content, status_code=status_code, media_type="text/html")
+
+    def clear(self):
+        self._pages.clear()
+
+
+error_pages = ErrorPageCache()
+
+
+async def http_error_handler(request: Request, exc: StarletteHTTPException) -> Response:
+    if exc.status_code == 404:
+        return error_pages.render(request, 404)
+    return await http_exception_handler(request, exc)
+
+
+async def server_error_handler(request: Request, exc: Exception) -> Response:
+    logger.error(f"Unhandled error on {request.url.path}: {exc!r}")
+    return error_pages.render(request, 500)
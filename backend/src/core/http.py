@@ -0,0 +1,54 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the process wide client for outgoing HTTP calls.
+
+    Sharing it keeps connections (and their TLS sessions) alive between
+    requests. Connection failures are retried by the transport, requests
+    that reached the server are not.
+    """
+    global _http_client
+    if _http_client is None:
+        http2 = settings.HTTP_CLIENT_HTTP2 and _http2_available()
+        if settings.HTTP_CLIENT_HTTP2 and not http2:
+            logger.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+        )
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+                connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS,
+            ),
+            transport=httpx.AsyncHTTPTransport(
+                http2=http2, limits=limits, retries=settings.HTTP_CLIENT_RETRIES
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
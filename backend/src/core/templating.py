@@ -0,0 +1,86 @@
+import logging
+import os
+import time
+from typing import Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, nodes
+from jinja2.ext import Extension
+
+from core.assets import static_url
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FragmentCacheExtension(Extension):
+    """Caches the rendered output of ``{% cache "key" %}...{% endcache %}`` blocks.
+
+    An optional second argument overrides the timeout in seconds, e.g.
+    ``{% cache "footer", 600 %}``. Only use it for blocks that do not depend on
+    the request, the fragment is shared by every render on this worker.
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment: Environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache={}, fragment_cache_timeout=0)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_cache_support", args), [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, key: str, timeout: Optional[int], caller) -> str:
+        if timeout is None:
+            timeout = self.environment.fragment_cache_timeout
+        if timeout <= 0:
+            return caller()
+
+        cached = self.environment.fragment_cache.get(key)
+        now = time.monotonic()
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        rendered = caller()
+        self.environment.fragment_cache[key] = (rendered, now + timeout)
+        return rendered
+
+
+def create_environment() -> Environment:
+    """Builds the Jinja2 environment, cached and without reload checks unless running in development."""
+    bytecode_cache = None
+    if settings.TEMPLATE_BYTECODE_CACHE_DIR:
+        # Cached bytecode is executed, nobody else may be able to write it
+        os.makedirs(settings.TEMPLATE_BYTECODE_CACHE_DIR, mode=0o700, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(settings.TEMPLATE_BYTECODE_CACHE_DIR)
+    elif settings.TEMPLATE_BYTECODE_CACHE:
+        # Jinja2 creates and checks a private directory for the current user
+        bytecode_cache = FileSystemBytecodeCache()
+
+    environment = Environment(
+        loader=FileSystemLoader(settings.TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=settings.TEMPLATE_AUTO_RELOAD,
+        bytecode_cache=bytecode_cache,
+        # Keep every template compiled in memory, there are only a few dozen
+        cache_size=-1,
+        extensions=[FragmentCacheExtension],
+    )
+    environment.fragment_cache_timeout = settings.TEMPLATE_FRAGMENT_CACHE_TTL_SECONDS
+    environment.globals["static_url"] = static_url
+    return environment
+
+
+def warm_templates(environment: Environment) -> int:
+    """Compiles every template up front so the first requests do not pay for it."""
+    started = time.perf_counter()
+    names = environment.list_templates(extensions=["html"])
+    for name in names:
+        environment.get_template(name)
+    logger.info(f"Pre-compiled {len(names)} templates in {(time.perf_counter() - started) * 1000:.1f}ms")
+    return len(names)
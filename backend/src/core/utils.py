@@ -1,9 +1,9 @@
 from fastapi import Request
 from fastapi.templating import Jinja2Templates
 
-from core.config import settings
+from core.templating import create_environment
 
-templates = Jinja2Templates(directory=settings.TEMPLATE_DIR)
+templates = Jinja2Templates(env=create_environment())
 
 
 def check_accept_header(request: Request) -> bool:
@@ -1,25 +1,117 @@
+import logging
+import random
 from datetime import datetime
+from pathlib import Path
 from typing import AsyncGenerator
+from uuid import uuid4
 
-from sqlalchemy import Boolean, DateTime, func
+from sqlalchemy import Boolean, DateTime, Select, event, func, inspect, make_url
+from sqlalchemy.sql.dml import UpdateBase
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
 from .config import database_settings
+from .pool import TimedAsyncAdaptedQueuePool, TimedNullPool
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI_PATH = Path(__file__).resolve().parents[2] / "alembic.ini"
 
 DATABASE_URL = database_settings.DATABASE_URL or (
     f"postgresql+asyncpg://{database_settings.DATABASE_USER}:{database_settings.DATABASE_PASSWORD}@{database_settings.DATABASE_HOST}:{database_settings.DATABASE_PORT}/{database_settings.DATABASE_NAME}"
 )
 
+
+def get_pool_limits_per_worker() -> tuple[int, int]:
+    """Splits the connection budget between workers so they cannot exhaust Postgres.
+
+    Returns ``(pool_size, max_overflow)``, whose sum stays within each worker's share.
+    """
+    if database_settings.DATABASE_MAX_CONNECTIONS <= 0:
+        return database_settings.DATABASE_ENGINE_POOL_SIZE, database_settings.DATABASE_ENGINE_MAX_OVERFLOW
+    workers = max(database_settings.DATABASE_WORKER_COUNT, 1)
+    per_worker = database_settings.DATABASE_MAX_CONNECTIONS // workers
+    if per_worker < 1:
+        raise ValueError(
+            f"DATABASE_MAX_CONNECTIONS={database_settings.DATABASE_MAX_CONNECTIONS} cannot give each of "
+            f"{workers} workers a connection"
+        )
+    # Overflow connections come out of the same budget
+    pool_size = max(per_worker - database_settings.DATABASE_ENGINE_MAX_OVERFLOW, 1)
+    max_overflow = min(database_settings.DATABASE_ENGINE_MAX_OVERFLOW, per_worker - pool_size)
+    return pool_size, max_overflow
+
+
+def get_engine_options(url: str) -> dict:
+    """Returns the ``create_async_engine`` options for the configured pool strategy."""
+    options: dict = {
+        "pool_pre_ping": database_settings.DATABASE_ENGINE_POOL_PING,
+        "isolation_level": database_settings.DATABASE_ISOLATION_LEVEL,
+    }
+    if database_settings.DATABASE_POOL_STRATEGY == "null":
+        # PgBouncer in transaction mode cannot keep prepared statements between transactions
+        options["poolclass"] = TimedNullPool
+        if make_url(url).get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+    else:
+        pool_size, max_overflow = get_pool_limits_per_worker()
+        options.update(
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=database_settings.DATABASE_ENGINE_POOL_TIMEOUT,
+            pool_recycle=database_settings.DATABASE_ENGINE_POOL_RECYCLE,
+        )
+    return options
+
+
 async_engine = create_async_engine(
-    database_settings.DATABASE_URL,
-    pool_size=database_settings.DATABASE_ENGINE_POOL_SIZE,
-    max_overflow=database_settings.DATABASE_ENGINE_MAX_OVERFLOW,
-    pool_pre_ping=database_settings.DATABASE_ENGINE_POOL_PING,
-    isolation_level="AUTOCOMMIT",
+    database_settings.DATABASE_URL, **get_engine_options(database_settings.DATABASE_URL)
 )
 AsyncSessionLocal = async_sessionmaker(bind=async_engine)
 
+replica_engines = [
+    create_async_engine(url, **get_engine_options(url))
+    for url in database_settings.DATABASE_REPLICA_URLS
+]
+
+
+class RoutingSession(Session):
+    """Sends plain reads to a read replica and everything else to the primary.
+
+    Once the session has written anything, every later statement goes to the
+    primary as well so the caller always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            not replica_engines
+            or self._flushing
+            or self.info.get("use_primary")
+            or not isinstance(clause, Select)
+            or clause._for_update_arg is not None
+        ):
+            if isinstance(clause, UpdateBase) or self._flushing:
+                self.info["use_primary"] = True
+            return async_engine.sync_engine
+
+        # Stay on one replica for the whole session for consistent reads
+        if "replica" not in self.info:
+            self.info["replica"] = random.choice(replica_engines).sync_engine
+        return self.info["replica"]
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def use_primary_after_commit(session: Session) -> None:
+    session.info["use_primary"] = True
+
+
+ReadSessionLocal = async_sessionmaker(sync_session_class=RoutingSession)
+
 
 class RemoveBaseFieldMixin:
     created_at: None
@@ -29,7 +121,6 @@ class RemoveBaseFieldMixin:
 
 class Base(DeclarativeBase):
     __abstract__ = True
-    # TODO: find a way to not create a schema each time a table is created
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -43,12 +134,70 @@ class Base(DeclarativeBase):
         return {field.name: getattr(self, field.name) for field in self.__table__.c}
 
 
-async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+def _get_migration_revisions(connection) -> tuple[set[str], set[str]]:
+    """Returns the (current, head) alembic revisions for the given connection."""
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(Config(str(ALEMBIC_INI_PATH)))
+    context = MigrationContext.configure(connection)
+    return set(context.get_current_heads()), set(script.get_heads())
+
+
+def _stamp_head(connection) -> None:
+    """Records the alembic head as applied, for a schema create_all just built from the models."""
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    script = ScriptDirectory.from_config(Config(str(ALEMBIC_INI_PATH)))
+    MigrationContext.configure(connection).stamp(script, "heads")
+
+
+async def init_db() -> None:
+    """Bootstraps the schema once at application startup.
+
+    Creates any missing tables and warns when the database is behind the
+    alembic migration head, so request handlers never pay for DDL checks.
+    An empty database is stamped at the head after create_all, the models
+    already match it and replaying the migrations would fail.
+    """
     async with async_engine.begin() as async_conn:
-        await async_conn.run_sync(Base.metadata.create_all)
+        if database_settings.DATABASE_CREATE_ALL_ON_STARTUP:
+            is_empty = not await async_conn.run_sync(lambda conn: inspect(conn).get_table_names())
+            await async_conn.run_sync(Base.metadata.create_all)
+            if is_empty:
+                try:
+                    await async_conn.run_sync(_stamp_head)
+                except Exception as e:
+                    logger.warning(f"Could not stamp the new database with the migration head: {e}")
+
+        if database_settings.DATABASE_CHECK_MIGRATIONS_ON_STARTUP:
+            try:
+                current, heads = await async_conn.run_sync(_get_migration_revisions)
+            except Exception as e:
+                logger.warning(f"Could not check database migrations: {e}")
+            else:
+                if current != heads:
+                    logger.warning(
+                        f"Database revision {sorted(current)} is behind migration head "
+                        f"{sorted(heads)}, run `alembic upgrade head`"
+                    )
 
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     db = AsyncSessionLocal()
     try:
         yield db
     finally:
         await db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read heavy endpoints, reads go to a replica when one is configured."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
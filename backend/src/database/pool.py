@@ -0,0 +1,46 @@
+import time
+from typing import Callable
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
+
+# Called with (pool, seconds waited) after every connection checkout
+checkout_listeners: list[Callable[[Pool, float], None]] = []
+
+
+class CheckoutTimingMixin:
+    """Reports how long each checkout waited for a connection to the listeners.
+
+    ``_do_get`` also opens new connections when the pool has room, that time is
+    taken out so that slow connects are not reported as queueing.
+    """
+
+    def _create_connection(self):
+        started = time.perf_counter()
+        record = super()._create_connection()
+        record._connect_seconds = time.perf_counter() - started
+        return record
+
+    def _report_wait(self, waited: float) -> None:
+        for listener in checkout_listeners:
+            listener(self, waited)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            # Waited the whole pool timeout for a connection
+            self._report_wait(time.perf_counter() - started)
+            raise
+        connect_seconds = record.__dict__.pop("_connect_seconds", 0.0)
+        self._report_wait(max(time.perf_counter() - started - connect_seconds, 0.0))
+        return record
+
+
+class TimedAsyncAdaptedQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(CheckoutTimingMixin, NullPool):
+    """Opens a connection per checkout, meant to sit behind PgBouncer."""
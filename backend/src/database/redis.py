@@ -0,0 +1,134 @@
+import fnmatch
+import time
+from typing import Any, Optional, Set
+
+import redis.asyncio as aioredis
+
+from .config import database_settings
+
+
+class InMemoryRedis:
+    """A small in-process stand-in for ``redis.asyncio.Redis``.
+
+    Implements the subset of the fakeredis/redis-py API used by the app so it
+    can be swapped in for tests and local development without a Redis server.
+    """
+
+    def __init__(self):
+        self._data: dict[str, Any] = {}
+        self._expires_at: dict[str, float] = {}
+
+    @staticmethod
+    def _name(name: str | bytes) -> str:
+        # redis-py accepts bytes keys, e.g. ones read back from a set
+        return name.decode() if isinstance(name, bytes) else name
+
+    def _expire_key(self, name: str) -> None:
+        expires_at = self._expires_at.get(name)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(name, None)
+            self._expires_at.pop(name, None)
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, name: str) -> Optional[bytes]:
+        name = self._name(name)
+        self._expire_key(name)
+        return self._data.get(name)
+
+    async def set(
+        self, name: str, value: Any, ex: Optional[int] = None, nx: bool = False
+    ) -> Optional[bool]:
+        name = self._name(name)
+        self._expire_key(name)
+        if nx and name in self._data:
+            return None
+        self._data[name] = self._encode(value)
+        self._expires_at.pop(name, None)
+        if ex is not None:
+            self._expires_at[name] = time.monotonic() + ex
+        return True
+
+    async def delete(self, *names: str) -> int:
+        deleted = 0
+        for name in map(self._name, names):
+            self._expire_key(name)
+            if self._data.pop(name, None) is not None:
+                deleted += 1
+            self._expires_at.pop(name, None)
+        return deleted
+
+    async def exists(self, *names: str) -> int:
+        count = 0
+        for name in names:
+            if await self.get(name) is not None:
+                count += 1
+        return count
+
+    async def expire(self, name: str, time_seconds: int) -> bool:
+        name = self._name(name)
+        self._expire_key(name)
+        if name not in self._data:
+            return False
+        self._expires_at[name] = time.monotonic() + time_seconds
+        return True
+
+    async def sadd(self, name: str, *values: Any) -> int:
+        name = self._name(name)
+        self._expire_key(name)
+        members: Set[bytes] = self._data.setdefault(name, set())
+        before = len(members)
+        members.update(self._encode(value) for value in values)
+        return len(members) - before
+
+    async def smembers(self, name: str) -> Set[bytes]:
+        name = self._name(name)
+        self._expire_key(name)
+        return set(self._data.get(name, set()))
+
+    async def keys(self, pattern: str = "*") -> list[bytes]:
+        pattern = self._name(pattern)
+        for name in list(self._data):
+            self._expire_key(name)
+        return [name.encode() for name in self._data if fnmatch.fnmatchcase(name, pattern)]
+
+    async def flushdb(self) -> bool:
+        self._data.clear()
+        self._expires_at.clear()
+        return True
+
+    async def aclose(self) -> None:
+        pass
+
+
+_redis_client: Optional[aioredis.Redis | InMemoryRedis] = None
+
+
+def get_redis_client() -> aioredis.Redis | InMemoryRedis:
+    """Returns the process wide Redis client configured by ``DatabaseSettings``."""
+    global _redis_client
+    if _redis_client is None:
+        if database_settings.REDIS_CACHE_BACKEND == "memory":
+            _redis_client = InMemoryRedis()
+        else:
+            _redis_client = aioredis.Redis(
+                host=database_settings.REDIS_HOST,
+                port=int(database_settings.REDIS_PORT),
+                password=database_settings.REDIS_PASSWORD,
+                db=database_settings.REDIS_DB,
+            )
+    return _redis_client
+
+
+async def close_redis_client() -> None:
+    global _redis_client
+    if _redis_client is not None:
+        await _redis_client.aclose()
+        _redis_client = None
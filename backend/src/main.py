@@ -1,35 +1,31 @@
 import logging
 from os import path
 
-import redis.asyncio as aioredis
 from admin.admin import BookingAdmin, OrganisationAdmin, ProductAdmin, UserAdmin
 from api import api_router
+from auth.cache import user_cache
+from auth.hashing import get_dummy_password_hash, password_hashing_executor
+from auth.last_login import last_login_buffer
+from auth.refresh_tokens import refresh_token_store
+from core.assets import PrecompressedStaticFiles
 from core.config import settings
+from core.error_pages import http_error_handler, server_error_handler
+from core.http import close_http_client
+from core.templating import warm_templates
 from core.utils import templates
-from database.core import async_engine
+from database.core import async_engine, init_db, replica_engines
+from database.redis import close_redis_client
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi_limiter import FastAPILimiter
-from pyinstrument import Profiler
-from pyinstrument.renderers.html import HTMLRenderer  # noqa: F401
+from monitoring.config import monitoring_settings
+from monitoring.database import instrument_engine
+from monitoring.middleware import MetricsMiddleware
+from profiling.config import profiling_settings
+from profiling.middleware import SamplingProfilerMiddleware
+from registration.services import shutdown_image_process_pool
 from sqladmin import Admin
-
-
-class PyInstrumentMiddleware:
-    def __init__(self, app):
-        self.app = app
-
-    async def __call__(self, scope, receive, send):
-        if scope["type"] == "http":
-            profiler = Profiler()
-            profiler.start()
-            await self.app(scope, receive, send)
-            profiler.stop()
-            profiler.open_in_browser()
-        else:
-            await self.app(scope, receive, send)
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 
 logging.basicConfig(
@@ -45,7 +41,8 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(openapi_url="")
 
-# app.add_middleware(PyInstrumentMiddleware)
+if profiling_settings.PROFILING_ENABLED:
+    app.add_middleware(SamplingProfilerMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],  # Adjust according to your needs
@@ -55,19 +52,30 @@ app.add_middleware(
 )
 
 
-# Rate limiting
 @app.on_event("startup")
 async def startup():
     # Load the startup logic
-    redis_limiter = aioredis.from_url(url="redis://localhost:6379")
-    await FastAPILimiter().init(redis=redis_limiter)
+    await init_db()
+    last_login_buffer.start()
+    refresh_token_store.start()
+    user_cache.start()
+    # Hash the login enumeration decoy up front rather than on the first login
+    await get_dummy_password_hash()
+    if settings.TEMPLATE_PRECOMPILE_ON_STARTUP:
+        warm_templates(templates.env)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await last_login_buffer.stop()
+    await refresh_token_store.stop()
+    await user_cache.stop()
+    password_hashing_executor.shutdown()
+    shutdown_image_process_pool()
+    await close_redis_client()
+    await close_http_client()
 
 
-# app.add_middleware(
-#     FastAPILimiter,
-#     rate_limit="5/minute"        # Adjust according to your needs
-# )
-
 frontend = FastAPI(openapi_url="")
 api = FastAPI(
     title="eNtweniBooking",
@@ -78,6 +86,12 @@ api = FastAPI(
     redoc_url="/docs",
 )
 
+if monitoring_settings.METRICS_ENABLED:
+    instrument_engine(async_engine)
+    for number, replica_engine in enumerate(replica_engines, start=1):
+        instrument_engine(replica_engine, label=f"replica-{number}")
+    api.add_middleware(MetricsMiddleware)
+
 admin = Admin(api, async_engine)
 admin.add_view(UserAdmin)
 admin.add_view(OrganisationAdmin)
@@ -85,16 +99,8 @@ admin.add_view(ProductAdmin)
 admin.add_view(BookingAdmin)
 
 
-@frontend.middleware("http")
-async def default_page(request: Request, call_next):
-    response = await call_next(request)
-    if response.status_code == 404:
-        # Render the 404 page using the custom template
-        template_response = templates.TemplateResponse(
-            "404.html", {"request": request, "data": {}, "error_message": "Not Found"}
-        )
-        return HTMLResponse(content=template_response.body.decode(), status_code=404)
-    return response
+frontend.add_exception_handler(StarletteHTTPException, http_error_handler)
+frontend.add_exception_handler(Exception, server_error_handler)
 
 
 @frontend.get("/", name="index")
@@ -103,6 +109,12 @@ def index(request: Request):
 
 
 if settings.STATIC_DIR and path.isdir(settings.STATIC_DIR):
+    # Fingerprinted assets, mounted first so /static does not shadow them
+    frontend.mount(
+        "/static/dist",
+        PrecompressedStaticFiles(directory=settings.STATIC_DIST_DIR, check_dir=False),
+        name="static_dist",
+    )
     # Consider changing the route for static files to avoid conflicts
     frontend.mount("/static", StaticFiles(directory=settings.STATIC_DIR), name="static")
 
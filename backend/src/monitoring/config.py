@@ -0,0 +1,15 @@
+from pydantic_settings import BaseSettings
+
+
+class MonitoringSettings(BaseSettings):
+
+    #################################### metrics ####################################
+    METRICS_ENABLED: bool = True
+    # Scrapers send it as a bearer token, /metrics is not served while it is empty
+    METRICS_TOKEN: str = ""
+    # Requests issuing more statements than this are logged as possible N+1 queries
+    METRICS_STATEMENT_WARNING_THRESHOLD: int = 25
+    #################################### metrics ####################################
+
+
+monitoring_settings = MonitoringSettings()
@@ -0,0 +1,75 @@
+import time
+from weakref import WeakKeyDictionary
+
+from database.pool import checkout_listeners
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import Pool
+
+from .metrics import (
+    Gauge,
+    current_request_stats,
+    db_pool_checkout_wait,
+    db_statements_total,
+    registry,
+)
+
+# Pools we report on, mapped to the engine label used in metrics
+_pool_labels: WeakKeyDictionary[Pool, str] = WeakKeyDictionary()
+_instrumented_engines: dict[str, AsyncEngine] = {}
+
+
+def _collect_pool_status():
+    for label, engine in _instrumented_engines.items():
+        pool = engine.sync_engine.pool
+        for state in ("checkedout", "checkedin", "overflow", "size"):
+            method = getattr(pool, state, None)
+            if method is not None:
+                yield (label, state), method()
+
+
+registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Connection pool state, by engine.",
+        ["engine", "state"],
+        _collect_pool_status,
+    )
+)
+
+
+def _record_checkout(pool: Pool, waited: float) -> None:
+    db_pool_checkout_wait.observe(waited, _pool_labels.get(pool, "unknown"))
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.pool_wait += waited
+
+
+checkout_listeners.append(_record_checkout)
+
+
+def instrument_engine(engine: AsyncEngine, *, label: str = "primary") -> None:
+    """Counts statements and SQL time per request through cursor execute events."""
+    sync_engine = engine.sync_engine
+    _pool_labels[sync_engine.pool] = label
+    _instrumented_engines[label] = engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        db_statements_total.inc(1, label)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        # Failed statements never reach after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
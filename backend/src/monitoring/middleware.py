@@ -0,0 +1,57 @@
+import logging
+import time
+
+from .config import monitoring_settings
+from .metrics import (
+    RequestStats,
+    current_request_stats,
+    request_db_time,
+    request_latency,
+    request_pool_wait,
+    request_statements,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """Records latency and database usage per route for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            current_request_stats.reset(token)
+
+            # Label by route template, raw paths would explode the cardinality
+            route = scope.get("route")
+            route_path = route.path if route else "unmatched"
+            method = scope["method"]
+            request_latency.observe(duration, method, route_path, str(status_code))
+            request_statements.observe(stats.statements, method, route_path)
+            request_db_time.observe(stats.db_time, method, route_path)
+            request_pool_wait.observe(stats.pool_wait, method, route_path)
+
+            if stats.statements > monitoring_settings.METRICS_STATEMENT_WARNING_THRESHOLD:
+                logger.warning(
+                    f"{method} {route_path} issued {stats.statements} SQL statements, possible N+1 query"
+                )
@@ -1,5 +1,5 @@
 from database.core import Base
-from sqlalchemy import Index
+from sqlalchemy import Index, and_
 from sqlalchemy.orm import Mapped, mapped_column
 
 # from product.models import Product
@@ -21,22 +21,14 @@ class Organisation(Base):
     # products: Mapped[List["Product"]] = relationship(back_populates="organisations")
     # bookings: Mapped[List[Booking]] = relationship()
 
-    # Indexes
-    __table_args__ = (
-        Index(
-            "idx_organisation_on_name_description",
-            "name",
-            "description",
-            postgresql_concurrently=True,
-        ),
-        Index(
-            "idx_organisation_on_name_description",
-            "name",
-            "description",
-            postgresql_concurrently=True,
-            postgresql_where=(active.is_(True)),
-        ),
-    )
-
     class Config:
         from_attributes = True
+
+
+# Serves the keyset pagination and counts over active organisations
+Index(
+    "idx_organisations_active_id",
+    Organisation.id,
+    postgresql_where=and_(Organisation.active.is_(True), Organisation.is_deleted.is_(False)),
+    sqlite_where=and_(Organisation.active.is_(True), Organisation.is_deleted.is_(False)),
+)
@@ -1,13 +1,15 @@
 import logging
 from typing import Optional
 
+from core.cache import response_cache
 from core.utils import check_accept_header, templates
-from database.core import get_async_db
+from database.core import get_async_db, get_async_read_db
 from fastapi import (
     APIRouter,
     BackgroundTasks,
     Depends,
     HTTPException,
+    Query,
     Request,
     status,
 )
@@ -21,6 +23,7 @@ from .schemas import (
     OrganisationUpdateSchema,
 )
 from .services import (
+    count_active,
     delete_organisation,
     get_all,
     get_by_id_filtered,
@@ -41,23 +44,57 @@ organisation_router = APIRouter(prefix="/organisations", tags=["Organisation"])
 )
 async def get_organisations(
     request: Request,
-    db_session: AsyncSession = Depends(get_async_db),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = Query(None, description="ID of the last organisation on the previous page"),
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    db_session: AsyncSession = Depends(get_async_read_db),
     is_template: Optional[bool] = Depends(check_accept_header),
 ):
-    """Get all organisations."""
+    """Get a page of organisations, paginated by ID."""
     try:
-        organisations = await get_all(db_session=db_session)
+        requested_fields = (
+            [field.strip() for field in fields.split(",") if field.strip()]
+            if fields and not is_template
+            else None
+        )
+
+        async def get_page():
+            # Fetch one extra row to know whether there is a next page
+            organisations = await get_all(
+                db_session=db_session,
+                limit=limit + 1,
+                cursor=cursor,
+                fields=requested_fields,
+            )
+            organisations, has_more = organisations[:limit], len(organisations) > limit
+            next_cursor = None
+            if has_more:
+                last = organisations[-1]
+                next_cursor = last["id"] if requested_fields else last.id
+
+            data = {"organisations": organisations, "next_cursor": next_cursor}
+            # Only the first page pays for the count, clients keep it while paging
+            if cursor is None:
+                data["total"] = (
+                    len(organisations)
+                    if not has_more
+                    else await count_active(db_session=db_session)
+                )
+            return data
 
         if is_template:
+            data = await get_page()
             return templates.TemplateResponse(
                 "organisation/list.html",
-                {"request": request, "organisations": organisations},
+                {"request": request, **data},
             )
 
-        return {
-            "organisations": organisations
-        }  # Directly return the list of organisations
+        return await response_cache.respond(
+            request, namespace="organisations", tags=["organisations"], build=get_page
+        )
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error getting organisations: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -90,26 +127,38 @@ async def create_organisation(
 async def get_organisation(
     request: Request,
     organisation_id: int,
-    db_session: AsyncSession = Depends(get_async_db),
+    db_session: AsyncSession = Depends(get_async_read_db),
     is_template: Optional[bool] = Depends(check_accept_header),
 ):
     """Get an organisation by ID."""
     try:
-        organisation = await get_by_id_filtered(
-            db_session=db_session, id=organisation_id, active=True
-        )
 
-        if not organisation:
-            raise HTTPException(status_code=404, detail="Organisation not found")
+        async def get_detail():
+            organisation = await get_by_id_filtered(
+                db_session=db_session, id=organisation_id, active=True
+            )
+
+            if not organisation:
+                raise HTTPException(status_code=404, detail="Organisation not found")
+
+            return {"organisation": organisation}
 
         if is_template:
+            data = await get_detail()
             return templates.TemplateResponse(
                 "organisation/detail.html",
-                {"request": request, "organisation": organisation},
+                {"request": request, **data},
             )
 
-        return {"organisation": organisation}
+        return await response_cache.respond(
+            request,
+            namespace="organisations",
+            tags=[f"organisation:{organisation_id}"],
+            build=get_detail,
+        )
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Error getting organisation: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,15 +1,19 @@
 import logging
 from typing import List, Optional
-from sqlalchemy import select, and_
+from sqlalchemy import func, select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
+from core.cache import response_cache
 
 from .models import Organisation
 from .schemas import OrganisationCreateSchema, OrganisationReadSchema, OrganisationUpdateSchema
 
 logger = logging.getLogger(__name__)
 
+# Columns that may be requested through the ``fields`` projection
+ORGANISATION_FIELDS = {column.key for column in Organisation.__table__.c}
+
 async def get_default(*, db_session: AsyncSession) -> Organisation | None:
     """Gets the default organisation."""
     query = select(Organisation).where(Organisation.default.is_(True))
@@ -63,13 +67,46 @@ async def get_or_default(*, db_session: AsyncSession, name: Optional[str] = None
             return organisation
     return await get_default_or_raise(db_session=db_session)
 
-async def get_all(*, db_session: AsyncSession) -> List[Organisation] | None:
-    """Gets all organisations."""
-    query = select(Organisation)
+async def get_all(
+    *,
+    db_session: AsyncSession,
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> List[Organisation] | List[dict]:
+    """Gets active organisations ordered by ID, starting after the ``cursor`` ID.
+
+    When ``fields`` is given only those columns (plus ``id``) are selected and
+    plain dicts are returned instead of ORM objects.
+    """
+    if fields:
+        unknown_fields = set(fields) - ORGANISATION_FIELDS
+        if unknown_fields:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown_fields))}")
+        columns = [Organisation.id] + [getattr(Organisation, field) for field in fields if field != "id"]
+        query = select(*columns)
+    else:
+        query = select(Organisation)
     query = await filter_active_and_not_deleted(query)  # Apply filter here
+
+    # Keyset pagination, seeks straight to the cursor using the primary key
+    if cursor is not None:
+        query = query.where(Organisation.id > cursor)
+    query = query.order_by(Organisation.id)
+    if limit is not None:
+        query = query.limit(limit)
+
     result = await db_session.execute(query)
+    if fields:
+        return [dict(row) for row in result.mappings()]
     return result.scalars().all()
 
+async def count_active(*, db_session: AsyncSession) -> int:
+    """Counts the organisations that are active and not deleted."""
+    query = await filter_active_and_not_deleted(select(func.count(Organisation.id)))
+    result = await db_session.execute(query)
+    return result.scalar_one()
+
 async def get_or_create(*, db_session: AsyncSession, organisation_in: OrganisationCreateSchema) -> Organisation:
     """Gets an existing organisation or creates a new one."""
     organisation = await get_by_attribute(db_session=db_session, attribute_name='name', attribute_value=organisation_in.name)
@@ -79,6 +116,7 @@ async def get_or_create(*, db_session: AsyncSession, organisation_in: Organisati
             db_session.add(organisation)
             await db_session.commit()
             await db_session.refresh(organisation)
+            await response_cache.invalidate("organisations")
         except SQLAlchemyError as e:
             logger.error(f"Error creating organisation: {e}")
             await db_session.rollback()
@@ -97,6 +135,7 @@ async def update_organisation(*, db_session: AsyncSession, organisation_id: int,
     db_session.add(organisation)
     await db_session.commit()
     await db_session.refresh(organisation)
+    await response_cache.invalidate("organisations", f"organisation:{organisation_id}")
     
     return organisation
 
@@ -110,6 +149,7 @@ async def set_organisation_status(*, db_session: AsyncSession, organisation_id:
     db_session.add(organisation)
     await db_session.commit()
     await db_session.refresh(organisation)
+    await response_cache.invalidate("organisations", f"organisation:{organisation_id}")
     
     return organisation
 
@@ -122,3 +162,4 @@ async def delete_organisation(*, db_session: AsyncSession, organisation_id: int)
     organisation.is_deleted = True
     db_session.add(organisation)
     await db_session.commit()
+    await response_cache.invalidate("organisations", f"organisation:{organisation_id}")
@@ -0,0 +1,21 @@
+from pydantic_settings import BaseSettings
+
+
+class ProductSettings(BaseSettings):
+
+    #################################### listing ####################################
+    PRODUCT_PAGE_SIZE: int = 50
+    PRODUCT_PAGE_MAX_SIZE: int = 200
+    #################################### listing ####################################
+
+    #################################### bulk import/export ####################################
+    # Rows copied into Postgres per COPY round trip
+    PRODUCT_IMPORT_BATCH_SIZE: int = 5_000
+    # Refuses imports past this many rows, they all run in one transaction
+    PRODUCT_IMPORT_MAX_ROWS: int = 250_000
+    # Rows fetched per server side cursor round trip while exporting
+    PRODUCT_EXPORT_BATCH_SIZE: int = 2_000
+    #################################### bulk import/export ####################################
+
+
+product_settings = ProductSettings()
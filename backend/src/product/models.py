@@ -1,4 +1,7 @@
+from typing import Optional
+
 from database.core import Base
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -6,13 +9,38 @@ class Product(Base):
     __tablename__ = "products"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(unique=True)
+    organisation_id: Mapped[int] = mapped_column(ForeignKey("organisations.id"))
+    name: Mapped[str]
     slug: Mapped[str]
-    default: Mapped[bool]
-    description: Mapped[str]
-    price: Mapped[float]
-    unit_of_measure: Mapped[str]
-    # organisation_id: Mapped[int] = mapped_column(ForeignKey("organisations.id"))
+    default: Mapped[bool] = mapped_column(default=False)
+    description: Mapped[Optional[str]] = mapped_column(nullable=True)
+    price: Mapped[Optional[float]] = mapped_column(nullable=True)
+    unit_of_measure: Mapped[Optional[str]] = mapped_column(nullable=True)
     # organisation: Mapped["Organisation"] = relationship()
     # booking_id: Mapped[int] = mapped_column(ForeignKey("bookings.id"))
     # booking: Mapped["Booking"] = relationship()
+
+
+# Names are unique within an organisation, deleted products free theirs up.
+# Also the conflict target of the bulk import upsert.
+Index(
+    "uq_products_organisation_name",
+    Product.organisation_id,
+    Product.name,
+    unique=True,
+    postgresql_where=Product.is_deleted.is_(False),
+    sqlite_where=Product.is_deleted.is_(False),
+)
+
+# Serves the keyset pagination and export of an organisation's catalogue
+Index(
+    "idx_products_organisation_id",
+    Product.organisation_id,
+    Product.id,
+    postgresql_where=Product.is_deleted.is_(False),
+    sqlite_where=Product.is_deleted.is_(False),
+)
+
+# Product columns a bulk import or export carries, in file order
+PRODUCT_IMPORT_COLUMNS = ("name", "slug", "description", "default", "price", "unit_of_measure")
+PRODUCT_EXPORT_COLUMNS = ("id", *PRODUCT_IMPORT_COLUMNS)
@@ -1,47 +1,162 @@
 from typing import Optional
 
-from core.utils import check_accept_header
-from database.core import get_async_db
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select
+from auth.models import User
+from auth.services import get_current_user
+from core.cache import response_cache
+from core.enums import FileFormat
+from core.utils import check_accept_header, templates
+from database.core import get_async_db, get_async_read_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import Product
+from .config import product_settings
+from .schemas import ProductCreate, ProductImportResult, ProductPage, ProductRead, ProductUpdate
+from .service import (
+    MEDIA_TYPES,
+    count,
+    create_product as create_product_service,
+    delete_product as delete_product_service,
+    export_products as export_products_service,
+    get_all,
+    get_by_id_or_raise,
+    get_organisation_or_raise,
+    import_products as import_products_service,
+    update_product as update_product_service,
+)
 
-product_router = APIRouter(prefix="/products", tags=["Products"])
+product_router = APIRouter(prefix="/organisations/{organisation_id}/products", tags=["Products"])
 
 
-@product_router.get("", name="read_products")
+@product_router.get("", name="read_products", response_model=ProductPage)
 async def get_products(
     request: Request,
+    organisation_id: int,
+    limit: int = Query(product_settings.PRODUCT_PAGE_SIZE, ge=1, le=product_settings.PRODUCT_PAGE_MAX_SIZE),
+    cursor: Optional[int] = Query(None, description="ID of the last product on the previous page"),
     is_template: Optional[bool] = Depends(check_accept_header),
-    db: AsyncSession = Depends(get_async_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    """Get all products."""
-    statement = await db.execute(select(Product))
-    products = statement.scalars().all()
+    """Get a page of an organisation's products, paginated by ID."""
+
+    async def get_page():
+        # Fetch one extra row to know whether there is a next page
+        products = await get_all(db_session=db, organisation_id=organisation_id, limit=limit + 1, cursor=cursor)
+        products, has_more = products[:limit], len(products) > limit
+        data = {
+            "products": [ProductRead.model_validate(product) for product in products],
+            "next_cursor": products[-1].id if has_more else None,
+        }
+        # Only the first page pays for the count, clients keep it while paging
+        if cursor is None:
+            data["total"] = len(products) if not has_more else await count(db_session=db, organisation_id=organisation_id)
+        return data
 
     if is_template:
-        return {"data": products, "error_message": None}
-    else:
-        return products
+        return templates.TemplateResponse("product/list.html", {"request": request, **(await get_page())})
+    return await response_cache.respond(
+        request, namespace="products", tags=["products"], build=get_page
+    )
+
+
+@product_router.post(
+    "",
+    name="create_product",
+    response_model=ProductRead,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_product(
+    organisation_id: int,
+    product: ProductCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Add a product to the catalogue, 409 if the name is taken."""
+    return await create_product_service(db_session=db, organisation_id=organisation_id, product_in=product)
+
+
+@product_router.get("/export", name="export_products")
+async def export_products(
+    organisation_id: int,
+    file_format: FileFormat = Query(FileFormat.csv, alias="format"),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """Stream the whole catalogue as CSV or NDJSON."""
+    await get_organisation_or_raise(db_session=db, organisation_id=organisation_id)
+    return StreamingResponse(
+        export_products_service(organisation_id=organisation_id, file_format=file_format),
+        media_type=MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="products-{organisation_id}.{file_format.value}"'
+        },
+    )
+
 
+@product_router.post("/import", name="import_products", response_model=ProductImportResult)
+async def import_products(
+    request: Request,
+    organisation_id: int,
+    file_format: Optional[FileFormat] = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Upsert products by name from a streamed CSV or NDJSON body.
 
-@product_router.post("", name="create_product")
-async def create_product():
-    return {"detail": "Create Product success"}
+    The format comes from ``?format=`` or else the Content-Type. The import is
+    all or nothing, the first invalid row rejects it with 422.
+    """
+    if file_format is None:
+        content_type = request.headers.get("content-type", "").split(";", 1)[0].strip()
+        file_format = next(
+            (candidate for candidate, media_type in MEDIA_TYPES.items() if media_type == content_type), None
+        )
+        if file_format is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Send {' or '.join(MEDIA_TYPES.values())}, or pass ?format=",
+            )
+    await get_organisation_or_raise(db_session=db, organisation_id=organisation_id)
+    return await import_products_service(
+        organisation_id=organisation_id, chunks=request.stream(), file_format=file_format
+    )
 
 
-@product_router.get("/{product_id}")
-async def get_product(product_id: int):
-    return {"detail": f"Product {product_id} details"}
+@product_router.get("/{product_id}", name="read_product", response_model=ProductRead)
+async def get_product(
+    request: Request,
+    organisation_id: int,
+    product_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    async def get_detail():
+        product = await get_by_id_or_raise(db_session=db, organisation_id=organisation_id, product_id=product_id)
+        return ProductRead.model_validate(product)
+
+    return await response_cache.respond(
+        request, namespace="products", tags=[f"product:{product_id}"], build=get_detail
+    )
 
 
-@product_router.put("/{product_id}", name="update_product")
-async def update_product(product_id: int):
-    return {"detail": f"Updated product {product_id}"}
+@product_router.put("/{product_id}", name="update_product", response_model=ProductRead)
+async def update_product(
+    organisation_id: int,
+    product_id: int,
+    product: ProductUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Update a product, 409 if it is renamed to a taken name."""
+    return await update_product_service(
+        db_session=db, organisation_id=organisation_id, product_id=product_id, product_in=product
+    )
 
 
 @product_router.delete("/{product_id}", name="delete_product")
-async def delete_product(product_id: int):
-    return {"detail": f"Deleted product {product_id}"}
+async def delete_product(
+    organisation_id: int,
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    await delete_product_service(db_session=db, organisation_id=organisation_id, product_id=product_id)
+    return {"detail": f"Deleted product with ID: {product_id}"}
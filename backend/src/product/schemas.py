@@ -1,37 +1,53 @@
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ProductBase(BaseModel):
-    id: int
-    name: str
+    name: str = Field(min_length=1, max_length=255)
+    slug: Optional[str] = Field(None, max_length=255)
     description: Optional[str] = Field(None)
     default: Optional[bool] = Field(False)
-    price: Optional[float]
-    unit_of_measure: Optional[str]
-    slug: Optional[str]
-    organisation_id: Optional[int]
+    price: Optional[float] = Field(None, ge=0)
+    unit_of_measure: Optional[str] = Field(None)
 
 
 class ProductCreate(ProductBase):
     pass
 
 
-# class ProductUpdate(CustomBaseModel):
-#     description: Optional[str] = Field(None)
-#     default: Optional[bool] = Field(False)
-#     # banner_enabled: Optional[bool] = Field(False)
-#     # banner_color: Optional[str] = Field(None)
-#     # banner_text: Optional[NameStr] = Field(None)
+class ProductUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    slug: Optional[str] = Field(None, max_length=255)
+    description: Optional[str] = Field(None)
+    default: Optional[bool] = Field(None)
+    price: Optional[float] = Field(None, ge=0)
+    unit_of_measure: Optional[str] = Field(None)
+
+    @model_validator(mode="after")
+    def check_not_null(self):
+        # Optional only so they can be left out, the columns are not nullable
+        for field in ("name", "slug", "default"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
 
 
 class ProductRead(ProductBase):
-    id: Optional[int]
-    slug: Optional[str]
-    name: Optional[str]
-    description: str
+    id: int
+    organisation_id: int
+    slug: str
+
+    class Config:
+        from_attributes = True
+
+
+class ProductPage(BaseModel):
+    products: List[ProductRead] = []
+    next_cursor: Optional[int] = None
+    total: Optional[int] = None
 
 
-# class ProductPagination(Pagination):
-#     items: List[ProductRead] = []
+class ProductImportResult(BaseModel):
+    imported: int
+    batches: int
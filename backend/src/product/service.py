@@ -0,0 +1,350 @@
+import codecs
+import csv
+import io
+import json
+import logging
+import re
+from typing import AsyncIterator, List, Optional
+
+from core.cache import response_cache
+from core.enums import FileFormat
+from database.core import ReadSessionLocal, async_engine
+from fastapi import HTTPException, status
+from organisation.models import Organisation
+from organisation.services import filter_active_and_not_deleted
+from pydantic import ValidationError
+from search.services import fallback_search_index
+from sqlalchemy import and_, func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from .config import product_settings
+from .models import PRODUCT_EXPORT_COLUMNS, PRODUCT_IMPORT_COLUMNS, Product
+from .schemas import ProductCreate, ProductUpdate
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    FileFormat.csv: "text/csv",
+    FileFormat.ndjson: "application/x-ndjson",
+}
+
+# Rows are copied into this table, then upserted into products in one statement
+STAGING_TABLE = "products_import"
+STAGING_COLUMNS = ("organisation_id", *PRODUCT_IMPORT_COLUMNS)
+CREATE_STAGING_TABLE = f"""CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    organisation_id integer,
+    name text,
+    slug text,
+    description text,
+    "default" boolean,
+    price double precision,
+    unit_of_measure text
+) ON COMMIT DROP"""
+UPSERT_FROM_STAGING = f"""INSERT INTO products (organisation_id, name, slug, description, "default", price, unit_of_measure, is_deleted)
+SELECT organisation_id, name, slug, description, "default", price, unit_of_measure, false FROM {STAGING_TABLE}
+ON CONFLICT (organisation_id, name) WHERE is_deleted IS false DO UPDATE SET
+    slug = EXCLUDED.slug,
+    description = EXCLUDED.description,
+    "default" = EXCLUDED."default",
+    price = EXCLUDED.price,
+    unit_of_measure = EXCLUDED.unit_of_measure,
+    updated_at = now()"""
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def visible_products(organisation_id: int):
+    """Filters the products of an organisation that have not been deleted."""
+    return and_(Product.organisation_id == organisation_id, Product.is_deleted.is_(False))
+
+
+async def get_organisation_or_raise(*, db_session: AsyncSession, organisation_id: int) -> Organisation:
+    """Returns the active organisation owning a catalogue or raises HTTPException."""
+    query = await filter_active_and_not_deleted(select(Organisation).where(Organisation.id == organisation_id))
+    organisation = (await db_session.execute(query)).scalar_one_or_none()
+    if organisation is None:
+        raise HTTPException(status_code=404, detail="Organisation not found")
+    return organisation
+
+
+async def get_all(
+    *,
+    db_session: AsyncSession,
+    organisation_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None,
+) -> List[Product]:
+    """Gets an organisation's products ordered by ID, starting after the ``cursor`` ID."""
+    query = select(Product).where(visible_products(organisation_id))
+    if cursor is not None:
+        query = query.where(Product.id > cursor)
+    query = query.order_by(Product.id)
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db_session.execute(query)
+    return result.scalars().all()
+
+
+async def count(*, db_session: AsyncSession, organisation_id: int) -> int:
+    """Counts an organisation's products."""
+    result = await db_session.execute(select(func.count(Product.id)).where(visible_products(organisation_id)))
+    return result.scalar_one()
+
+
+async def get_by_id_or_raise(*, db_session: AsyncSession, organisation_id: int, product_id: int) -> Product:
+    """Returns an organisation's product or raises HTTPException."""
+    query = select(Product).where(Product.id == product_id, visible_products(organisation_id))
+    product = (await db_session.execute(query)).scalar_one_or_none()
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+
+async def _commit_product(*, db_session: AsyncSession, product: Product) -> Product:
+    db_session.add(product)
+    try:
+        await db_session.commit()
+    except IntegrityError:
+        await db_session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Product with name '{product.name}' already exists",
+        )
+    await db_session.refresh(product)
+    await response_cache.invalidate("products", f"product:{product.id}")
+    return product
+
+
+async def create_product(*, db_session: AsyncSession, organisation_id: int, product_in: ProductCreate) -> Product:
+    """Adds a product to an organisation's catalogue, 409 if the name is taken."""
+    await get_organisation_or_raise(db_session=db_session, organisation_id=organisation_id)
+    values = product_in.model_dump()
+    values["slug"] = values["slug"] or slugify(product_in.name)
+    values["default"] = bool(values["default"])
+    product = Product(organisation_id=organisation_id, **values)
+    return await _commit_product(db_session=db_session, product=product)
+
+
+async def update_product(
+    *, db_session: AsyncSession, organisation_id: int, product_id: int, product_in: ProductUpdate
+) -> Product:
+    """Updates the given fields of a product, 409 if it is renamed to a taken name."""
+    product = await get_by_id_or_raise(db_session=db_session, organisation_id=organisation_id, product_id=product_id)
+    for field, value in product_in.model_dump(exclude_unset=True).items():
+        setattr(product, field, value)
+    return await _commit_product(db_session=db_session, product=product)
+
+
+async def delete_product(*, db_session: AsyncSession, organisation_id: int, product_id: int) -> None:
+    """Soft deletes a product, its bookings keep pointing at it."""
+    product = await get_by_id_or_raise(db_session=db_session, organisation_id=organisation_id, product_id=product_id)
+    product.is_deleted = True
+    db_session.add(product)
+    await db_session.commit()
+    await response_cache.invalidate("products", f"product:{product_id}")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits a streamed UTF-8 body into lines, each keeping its newline."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[dict]:
+    """Parses CSV records, a quoted field may span several lines."""
+    header = None
+    record = ""
+    async for line in lines:
+        record += line
+        # An odd number of quotes means a quoted field is still open
+        if record.count('"') % 2:
+            continue
+        values, record = next(csv.reader([record]), []), ""
+        if not values:
+            continue
+        if header is None:
+            header = [value.strip() for value in values]
+            # Exports carry the ID, it is ignored so that they can be imported again
+            unknown_columns = set(header) - set(PRODUCT_EXPORT_COLUMNS)
+            if unknown_columns or "name" not in header:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"CSV header must have a name column and only {', '.join(PRODUCT_EXPORT_COLUMNS)}",
+                )
+            continue
+        # Empty cells are missing values, not empty strings
+        yield {column: value for column, value in zip(header, values) if value != ""}
+    if record.strip():
+        raise HTTPException(status_code=422, detail="CSV ends inside a quoted field")
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[dict]:
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Line {number}: {e}")
+        if not isinstance(row, dict):
+            raise HTTPException(
+                status_code=422, detail=f"Line {number}: expected a JSON object"
+            )
+        yield row
+
+
+async def iter_import_records(
+    chunks: AsyncIterator[bytes], file_format: FileFormat, organisation_id: int
+) -> AsyncIterator[tuple]:
+    """Validates the streamed rows and turns them into ``STAGING_COLUMNS`` tuples."""
+    lines = iter_lines(chunks)
+    rows = iter_csv_rows(lines) if file_format is FileFormat.csv else iter_ndjson_rows(lines)
+    number = 0
+    async for row in rows:
+        number += 1
+        if number > product_settings.PRODUCT_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Imports are limited to {product_settings.PRODUCT_IMPORT_MAX_ROWS} rows",
+            )
+        try:
+            product = ProductCreate.model_validate(row)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+            raise HTTPException(status_code=422, detail=f"Row {number}: {errors}")
+        yield (
+            organisation_id,
+            product.name,
+            product.slug or slugify(product.name),
+            product.description,
+            bool(product.default),
+            product.price,
+            product.unit_of_measure,
+        )
+
+
+async def _copy_batch(connection: AsyncConnection, records: List[tuple]) -> None:
+    """Loads a batch with ``COPY`` into the staging table, then upserts it."""
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        STAGING_TABLE, records=records, columns=STAGING_COLUMNS
+    )
+    await connection.execute(text(UPSERT_FROM_STAGING))
+    await connection.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+
+def _upsert_statement(dialect_name: str):
+    """Batched ORM-free upsert for drivers without ``COPY`` support."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(Product)
+    statement = dialect_insert(Product)
+    return statement.on_conflict_do_update(
+        index_elements=[Product.organisation_id, Product.name],
+        index_where=Product.is_deleted.is_(False),
+        set_={
+            **{column: statement.excluded[column] for column in PRODUCT_IMPORT_COLUMNS if column != "name"},
+            "updated_at": func.now(),
+        },
+    )
+
+
+async def import_products(
+    *, organisation_id: int, chunks: AsyncIterator[bytes], file_format: FileFormat
+) -> dict:
+    """Upserts the streamed rows into an organisation's catalogue by name, all or nothing.
+
+    Rows are loaded in batches of ``PRODUCT_IMPORT_BATCH_SIZE``, through
+    ``COPY`` on asyncpg and a multi-row insert otherwise. A name repeated in
+    the file keeps its last row, an ``id`` column is ignored.
+    """
+    imported = batches = 0
+    # Only products that existed before can have cached detail responses
+    updated_ids: List[int] = []
+    # Its own connection, sessions run in autocommit and the import is one transaction
+    async with async_engine.connect() as connection:
+        connection = await connection.execution_options(
+            isolation_level=connection.dialect.default_isolation_level
+        )
+        use_copy = connection.dialect.driver == "asyncpg"
+        upsert = None if use_copy else _upsert_statement(connection.dialect.name)
+        async with connection.begin():
+            if use_copy:
+                await connection.execute(text(CREATE_STAGING_TABLE))
+
+            async def flush(batch: dict) -> None:
+                nonlocal imported, batches
+                records = list(batch.values())
+                existing = await connection.execute(
+                    select(Product.id).where(visible_products(organisation_id), Product.name.in_(list(batch)))
+                )
+                updated_ids.extend(existing.scalars())
+                if use_copy:
+                    await _copy_batch(connection, records)
+                else:
+                    await connection.execute(
+                        upsert,
+                        [{**dict(zip(STAGING_COLUMNS, record)), "is_deleted": False} for record in records],
+                    )
+                imported += len(records)
+                batches += 1
+
+            batch: dict = {}
+            async for record in iter_import_records(chunks, file_format, organisation_id):
+                # Keyed by name, one statement cannot upsert the same product twice
+                batch.pop(record[1], None)
+                batch[record[1]] = record
+                if len(batch) >= product_settings.PRODUCT_IMPORT_BATCH_SIZE:
+                    await flush(batch)
+                    batch = {}
+            if batch:
+                await flush(batch)
+
+    logger.info(f"Imported {imported} products into organisation {organisation_id} in {batches} batches")
+    # COPY bypasses the ORM events that keep the search fallback fresh
+    fallback_search_index.invalidate()
+    await response_cache.invalidate("products", *(f"product:{product_id}" for product_id in updated_ids))
+    return {"imported": imported, "batches": batches}
+
+
+def _format_rows(rows, file_format: FileFormat) -> str:
+    if file_format is FileFormat.csv:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+    return "".join(json.dumps(dict(zip(PRODUCT_EXPORT_COLUMNS, row))) + "\n" for row in rows)
+
+
+async def export_products(*, organisation_id: int, file_format: FileFormat) -> AsyncIterator[str]:
+    """Streams an organisation's catalogue ordered by ID, never holding more than one batch.
+
+    Opens its own session because the response outlives the request's dependencies.
+    """
+    if file_format is FileFormat.csv:
+        yield _format_rows([PRODUCT_EXPORT_COLUMNS], file_format)
+    async with ReadSessionLocal() as db_session:
+        query = (
+            select(*(getattr(Product, column) for column in PRODUCT_EXPORT_COLUMNS))
+            .where(visible_products(organisation_id))
+            .order_by(Product.id)
+            .execution_options(yield_per=product_settings.PRODUCT_EXPORT_BATCH_SIZE)
+        )
+        result = await db_session.stream(query)
+        async for rows in result.partitions():
+            yield _format_rows(rows, file_format)
@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+from pydantic_settings import BaseSettings
+
+
+class ProfilingSettings(BaseSettings):
+
+    #################################### request profiling ####################################
+    PROFILING_ENABLED: bool = False
+    # Profile one in every N requests, 0 only profiles explicitly flagged requests
+    PROFILING_SAMPLE_RATE: int = 1000
+    # Requests carrying this header or query parameter set to PROFILING_TOKEN are always profiled
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_QUERY_PARAM: str = "profile"
+    # Flagged requests are ignored while this is empty
+    PROFILING_TOKEN: str = ""
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_FORMAT: str = "html"  # html | speedscope
+    PROFILING_DIR: str = os.path.join(tempfile.gettempdir(), "entweni-profiles")
+    # Profiles kept on disk, shared by all worker processes, the oldest are pruned
+    PROFILING_MAX_PROFILES: int = 100
+    #################################### request profiling ####################################
+
+
+profiling_settings = ProfilingSettings()
@@ -0,0 +1,89 @@
+import asyncio
+import hmac
+import logging
+import time
+from urllib.parse import parse_qs
+
+from pyinstrument import Profiler
+
+from .config import profiling_settings
+from .services import ProfileStore, profile_store
+
+logger = logging.getLogger(__name__)
+
+
+class SamplingProfilerMiddleware:
+    """Profiles one in ``sample_rate`` HTTP requests, plus explicitly flagged ones.
+
+    Profiles are written to a bounded on-disk ring instead of being opened in
+    a browser, so this is safe to enable on a server.
+    """
+
+    def __init__(self, app, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+        self.sample_rate = profiling_settings.PROFILING_SAMPLE_RATE
+        self.header = profiling_settings.PROFILING_HEADER.lower().encode()
+        self._requests = 0
+
+    def is_flagged(self, scope) -> bool:
+        if not profiling_settings.PROFILING_TOKEN:
+            # Without a token anyone could make the server profile their requests
+            return False
+        value = None
+        for name, header_value in scope.get("headers", []):
+            if name == self.header:
+                value = header_value.decode()
+                break
+        if value is None:
+            query = parse_qs(scope.get("query_string", b"").decode())
+            values = query.get(profiling_settings.PROFILING_QUERY_PARAM)
+            value = values[0] if values else None
+        if value is None:
+            return False
+        return hmac.compare_digest(value.encode(), profiling_settings.PROFILING_TOKEN.encode())
+
+    def should_profile(self, scope) -> bool:
+        if self.is_flagged(scope):
+            return True
+        if self.sample_rate <= 0:
+            return False
+        self._requests += 1
+        return self._requests % self.sample_rate == 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profiler = Profiler(interval=profiling_settings.PROFILING_INTERVAL, async_mode="enabled")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            duration = time.perf_counter() - started
+            route = scope.get("route")
+            route_path = f"{scope.get('root_path', '')}{route.path}" if route else "unmatched"
+            try:
+                # Rendering is CPU bound, keep it off the event loop
+                await asyncio.to_thread(
+                    self.store.save,
+                    profiler,
+                    method=scope["method"],
+                    path=scope["path"],
+                    route=route_path,
+                    status_code=status_code,
+                    duration=duration,
+                )
+            except Exception as e:
+                logger.error(f"Failed to store request profile: {e}")
@@ -0,0 +1,28 @@
+from auth.services import get_current_superuser
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from .services import profile_store
+
+profiling_router = APIRouter(
+    prefix="/profiles",
+    tags=["Profiling"],
+    dependencies=[Depends(get_current_superuser)],
+)
+
+
+@profiling_router.get("", name="profiles")
+async def list_profiles(per_route: int = Query(5, ge=1, le=50)):
+    """List the slowest recently profiled requests for each route."""
+    return {"routes": profile_store.list_slowest(per_route=per_route)}
+
+
+@profiling_router.get("/{name}", name="profile_detail")
+async def get_profile(name: str):
+    """Download a stored profile, HTML or speedscope JSON."""
+    path = profile_store.get_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    media_type = "text/html" if path.suffix == ".html" else "application/json"
+    return FileResponse(path, media_type=media_type)
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+from pyinstrument import Profiler
+from pyinstrument.renderers import SpeedscopeRenderer
+
+from .config import profiling_settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_NAME_PATTERN = re.compile(r"^\d+-\d+$")
+
+
+class ProfileStore:
+    """A bounded on-disk store of request profiles.
+
+    Every worker process writes ``<pid>-<n>`` files so that concurrent workers
+    never overwrite each other's profiles. After each save the oldest profiles
+    of all workers, including ones that have exited, are pruned down to
+    ``max_profiles``.
+    """
+
+    def __init__(self, *, directory: str, max_profiles: int, output_format: str):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self.output_format = output_format
+        self._counter = 0
+
+    @property
+    def extension(self) -> str:
+        return "speedscope.json" if self.output_format == "speedscope" else "html"
+
+    def save(
+        self,
+        profiler: Profiler,
+        *,
+        method: str,
+        path: str,
+        route: str,
+        status_code: Optional[int],
+        duration: float,
+    ) -> str:
+        """Renders the profile, prunes the oldest ones and returns its name."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{os.getpid()}-{self._counter:06d}"
+        self._counter += 1
+
+        if self.output_format == "speedscope":
+            output = profiler.output(renderer=SpeedscopeRenderer())
+        else:
+            output = profiler.output_html()
+        (self.directory / f"{name}.{self.extension}").write_text(output, encoding="utf-8")
+
+        metadata = {
+            "name": name,
+            "method": method,
+            "path": path,
+            "route": route,
+            "status_code": status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "created_at": time.time(),
+            "format": self.output_format,
+        }
+        (self.directory / f"{name}.json").write_text(json.dumps(metadata), encoding="utf-8")
+        self.prune()
+        return name
+
+    def _metadata_paths(self) -> list[Path]:
+        return [path for path in self.directory.glob("*-*.json") if PROFILE_NAME_PATTERN.match(path.stem)]
+
+    def prune(self) -> None:
+        """Deletes the oldest profiles beyond ``max_profiles``, whichever worker wrote them."""
+
+        def modified_at(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                # Pruned by another worker meanwhile
+                return 0.0
+
+        metadata_paths = sorted(self._metadata_paths(), key=modified_at, reverse=True)
+        for metadata_path in metadata_paths[self.max_profiles :]:
+            for extension in ("json", "html", "speedscope.json"):
+                (self.directory / f"{metadata_path.stem}.{extension}").unlink(missing_ok=True)
+
+    def list_slowest(self, *, per_route: int = 5) -> dict[str, list[dict]]:
+        """Returns the slowest stored profiles, grouped by route."""
+        by_route: dict[str, list[dict]] = defaultdict(list)
+        if not self.directory.is_dir():
+            return {}
+        for metadata_path in self._metadata_paths():
+            try:
+                metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.debug(f"Skipping unreadable profile {metadata_path}: {e}")
+                continue
+            by_route[f"{metadata['method']} {metadata['route']}"].append(metadata)
+
+        return {
+            route: sorted(profiles, key=lambda item: item["duration_ms"], reverse=True)[:per_route]
+            for route, profiles in sorted(by_route.items())
+        }
+
+    def get_path(self, name: str) -> Optional[Path]:
+        """Returns the rendered profile file, ``None`` for unknown or malformed names."""
+        if not PROFILE_NAME_PATTERN.match(name):
+            return None
+        for extension in ("html", "speedscope.json"):
+            path = self.directory / f"{name}.{extension}"
+            if path.is_file():
+                return path
+        return None
+
+
+profile_store = ProfileStore(
+    directory=profiling_settings.PROFILING_DIR,
+    max_profiles=profiling_settings.PROFILING_MAX_PROFILES,
+    output_format=profiling_settings.PROFILING_FORMAT,
+)
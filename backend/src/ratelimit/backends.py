@@ -0,0 +1,140 @@
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Sequence
+from uuid import uuid4
+
+from database.redis import InMemoryRedis, get_redis_client
+
+from .config import rate_limit_settings
+
+logger = logging.getLogger(__name__)
+
+# Checks every key's window and only records the hit when all of them have
+# room, so a rejected request does not use up the other keys' allowance.
+# Returns 0 when allowed, otherwise the milliseconds until a slot frees up.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local member = ARGV[4]
+local retry_after = 0
+for _, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry_after > 0 then
+    return math.ceil(retry_after)
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+end
+return 0
+"""
+
+
+class LocalTokenBuckets:
+    """Per-worker token buckets that turn away floods without a Redis round trip.
+
+    Every bucket holds ``capacity`` tokens and refills at ``capacity`` per
+    ``period``, so a single worker never lets through more than the shared
+    limit would. The least recently used buckets are dropped past ``max_keys``.
+    """
+
+    def __init__(self, max_keys: int = rate_limit_settings.RATE_LIMIT_LOCAL_MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def consume(self, key: str, capacity: int, period: float) -> float:
+        """Takes a token, returns 0 when allowed or the seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (float(capacity), now))
+        rate = capacity / period
+        tokens = min(float(capacity), tokens + (now - updated_at) * rate)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class MemorySlidingWindow:
+    """Sliding window log kept in process, exact per worker but not shared between them."""
+
+    def __init__(self, max_keys: int = rate_limit_settings.RATE_LIMIT_LOCAL_MAX_KEYS):
+        self.max_keys = max_keys
+        self._hits: OrderedDict[str, deque] = OrderedDict()
+
+    async def hit(self, keys: Sequence[str], limit: int, period: float) -> float:
+        """Records a hit against every key, returns 0 when allowed or the seconds to wait."""
+        now = time.monotonic()
+        retry_after = 0.0
+        windows = []
+        for key in keys:
+            hits = self._hits.pop(key, None) or deque()
+            while hits and hits[0] <= now - period:
+                hits.popleft()
+            if len(hits) >= limit:
+                retry_after = max(retry_after, hits[0] + period - now)
+            self._hits[key] = hits
+            windows.append(hits)
+        if not retry_after:
+            for hits in windows:
+                hits.append(now)
+        while len(self._hits) > self.max_keys:
+            self._hits.popitem(last=False)
+        return retry_after
+
+    def clear(self):
+        self._hits.clear()
+
+
+class RedisSlidingWindow:
+    """Sliding window shared by every worker, one Lua script call per request.
+
+    Degrades open: while Redis is unreachable hits are counted by a
+    :class:`MemorySlidingWindow`, so limits hold per worker instead of failing
+    every request.
+    """
+
+    def __init__(self, fallback: Optional[MemorySlidingWindow] = None):
+        self.fallback = fallback or MemorySlidingWindow()
+        self._script = None
+        self._retry_redis_at = 0.0
+
+    def _get_script(self):
+        client = get_redis_client()
+        if isinstance(client, InMemoryRedis):
+            return None
+        if self._script is None or self._script.registered_client is not client:
+            self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        return self._script
+
+    async def hit(self, keys: Sequence[str], limit: int, period: float) -> float:
+        script = self._get_script() if time.monotonic() >= self._retry_redis_at else None
+        if script is None:
+            return await self.fallback.hit(keys, limit, period)
+        try:
+            retry_after_ms = await script(
+                keys=list(keys),
+                args=[int(time.time() * 1000), int(period * 1000), limit, uuid4().hex],
+            )
+        except Exception as e:
+            logger.warning(
+                f"Rate limiting falls back to memory for {rate_limit_settings.RATE_LIMIT_REDIS_RETRY_SECONDS}s, Redis failed: {e}"
+            )
+            self._retry_redis_at = time.monotonic() + rate_limit_settings.RATE_LIMIT_REDIS_RETRY_SECONDS
+            return await self.fallback.hit(keys, limit, period)
+        return int(retry_after_ms) / 1000
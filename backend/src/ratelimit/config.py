@@ -0,0 +1,20 @@
+from pydantic_settings import BaseSettings
+
+
+class RateLimitSettings(BaseSettings):
+
+    #################################### rate limiting ####################################
+    RATE_LIMIT_ENABLED: bool = True
+    # redis: shared sliding window across workers, memory: per worker only
+    RATE_LIMIT_BACKEND: str = "redis"
+    RATE_LIMIT_KEY_PREFIX: str = "ratelimit"
+    # How long to stay on the in-memory window after Redis fails before retrying it
+    RATE_LIMIT_REDIS_RETRY_SECONDS: int = 30
+    # Upper bound on the keys tracked in memory by each worker
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 100_000
+    # Only enable behind a proxy that overwrites X-Forwarded-For
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    #################################### rate limiting ####################################
+
+
+rate_limit_settings = RateLimitSettings()
@@ -0,0 +1,85 @@
+import hashlib
+import logging
+import math
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+from .backends import LocalTokenBuckets, MemorySlidingWindow, RedisSlidingWindow
+from .config import rate_limit_settings
+
+logger = logging.getLogger(__name__)
+
+local_buckets = LocalTokenBuckets()
+sliding_window = (
+    RedisSlidingWindow()
+    if rate_limit_settings.RATE_LIMIT_BACKEND == "redis"
+    else MemorySlidingWindow()
+)
+
+
+def get_client_ip(request: Request) -> str:
+    if rate_limit_settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded_for = request.headers.get("X-Forwarded-For")
+        if forwarded_for:
+            return forwarded_for.split(",", 1)[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def get_identifier(request: Request, field: str) -> Optional[str]:
+    """Reads ``field`` from the JSON or urlencoded body, which the route can still read afterwards.
+
+    Multipart bodies are never read, parsing one would spool its uploads before
+    the route can check their size. Those requests are only limited per IP.
+    """
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip()
+    try:
+        if content_type == "application/json":
+            value = (await request.json()).get(field)
+        elif content_type == "application/x-www-form-urlencoded":
+            value = (await request.form()).get(field)
+        else:
+            return None
+    except Exception:
+        return None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    # Keep personal data out of the limiter keys
+    return hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+
+
+class RateLimiter:
+    """Limits a route to ``times`` requests per ``seconds`` per client IP and, if
+    ``identifier_field`` is given, per value of that JSON or urlencoded body
+    field across all IPs.
+
+    A per-worker token bucket rejects obvious floods locally, the rest are
+    counted in the shared sliding window.
+    """
+
+    def __init__(self, times: int, seconds: int, identifier_field: Optional[str] = None):
+        self.times = times
+        self.seconds = seconds
+        self.identifier_field = identifier_field
+
+    async def __call__(self, request: Request):
+        if not rate_limit_settings.RATE_LIMIT_ENABLED:
+            return
+
+        scope = f"{rate_limit_settings.RATE_LIMIT_KEY_PREFIX}:{request.scope['path']}"
+        keys = [f"{scope}:ip:{get_client_ip(request)}"]
+        if self.identifier_field:
+            identifier = await get_identifier(request, self.identifier_field)
+            if identifier:
+                keys.append(f"{scope}:id:{identifier}")
+
+        retry_after = max(local_buckets.consume(key, self.times, self.seconds) for key in keys)
+        if not retry_after:
+            retry_after = await sliding_window.hit(keys, self.times, self.seconds)
+        if retry_after:
+            logger.info(f"Rate limited {keys[0]} on {request.scope['path']}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too Many Requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
@@ -1,17 +1,31 @@
 import logging
+from pathlib import Path
 from typing import Optional
 
 from auth.models import User
-from auth.services import get_user_by_login_identifier
+from auth.services import get_current_user
 from core.utils import check_accept_header, templates
 from database.core import get_async_db
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    status,
+)
 from fastapi.responses import JSONResponse
-from fastapi_limiter.depends import RateLimiter
+from ratelimit.depends import RateLimiter
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import UploadFile as StarletteUploadFile
 
 from .schemas import UserRegistrationSchema
-from .services import ImageSaver, create_user
+from .services import (
+    ImageSaver,
+    UserAlreadyExistsError,
+    create_user,
+    raise_if_upload_too_large,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +55,7 @@ async def register(
     "/register/",
     summary="Register a new User",
     name="register",
-    dependencies=[Depends(RateLimiter(times=5, seconds=60))],
+    dependencies=[Depends(RateLimiter(times=5, seconds=60, identifier_field="email"))],
 )
 async def register_user(
     request: Request,
@@ -50,9 +64,11 @@ async def register_user(
     db_session: AsyncSession = Depends(get_async_db),
 ):
     """Register a new user and handle image upload if provided."""
+    image_path: Optional[Path] = None
     try:
         if is_template:
-            # Handle form data
+            # Handle form data, refusing oversized uploads before parsing them
+            raise_if_upload_too_large(request.headers.get("content-length"))
             form = await request.form()
             user_schema = UserRegistrationSchema(
                 username=form.get("username"),  # type: ignore
@@ -60,8 +76,11 @@ async def register_user(
                 password=form.get("password"),  # type: ignore
                 first_name=form.get("first_name"),  # type: ignore
                 last_name=form.get("last_name"),  # type: ignore
-                uploaded_image=form.get("uploaded_image"),  # type: ignore
             )
+            uploaded_image = form.get("uploaded_image")
+            if isinstance(uploaded_image, StarletteUploadFile) and uploaded_image.filename:
+                # Stream the image to disk before anything is committed
+                image_path = await ImageSaver.save_upload(uploaded_image)
         else:
             # Handle JSON data
             user_schema = UserRegistrationSchema(**await request.json())
@@ -69,17 +88,13 @@ async def register_user(
         # Logging for server side events
         logger.info(f"User registration attempted, USERNAME: {user_schema.username}")
 
-        # Check if the user already exists
-        existing_user_by_email = await get_user_by_login_identifier(
-            db_session=db_session, login_identifier=user_schema.email
-        )
-        existing_user_by_username = await get_user_by_login_identifier(
-            db_session=db_session,
-            login_identifier=user_schema.username,
-        )
-
-        if existing_user_by_email or existing_user_by_username:
-            error_message = "User with provided Username / Email already exists"
+        # Create the new user, the unique constraints reject existing users
+        try:
+            user: User = await create_user(db_session=db_session, user_schema=user_schema)
+        except UserAlreadyExistsError as e:
+            if image_path:
+                image_path.unlink(missing_ok=True)
+            error_message = str(e)
             if is_template:
                 return templates.TemplateResponse(
                     "auth/signup.html",
@@ -92,21 +107,17 @@ async def register_user(
                 )
             else:
                 return JSONResponse(
+                    status_code=status.HTTP_409_CONFLICT,
                     content={
                         "status_code": status.HTTP_409_CONFLICT,
                         "detail": error_message,
+                        "fields": e.fields,
                     },
                 )
 
-        # Create a new user
-        user: User = await create_user(db_session=db_session, user_schema=user_schema)
-
-        # Handle user image upload if provided
-        if user_schema.uploaded_image:
-            image_saver = ImageSaver()
-            background_tasks.add_task(
-                image_saver.save_user_image, user, user_schema.uploaded_image
-            )
+        # Thumbnail, upload and store the user image after responding
+        if image_path:
+            background_tasks.add_task(ImageSaver.save_user_image, user.id, image_path)
 
         # Success message
         success_message = "Registration successful. Please log in."
@@ -130,7 +141,41 @@ async def register_user(
             )
 
     except HTTPException as http_exc:
+        if image_path:
+            image_path.unlink(missing_ok=True)
         raise http_exc  # Re-raise known HTTP exceptions
     except Exception as e:
+        if image_path:
+            image_path.unlink(missing_ok=True)
         logger.error(f"Error during user registration: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@account_router.post(
+    "/account/image",
+    summary="Upload a profile picture for the logged in user",
+    name="upload_user_image",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def upload_user_image(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+):
+    """Stream the image to storage, the thumbnail and URL update happen in the background.
+
+    Expects a multipart form with an ``image`` file. The form is parsed here
+    rather than through ``File()`` so oversized uploads are refused before
+    their body is read.
+    """
+    raise_if_upload_too_large(request.headers.get("content-length"))
+    form = await request.form(max_files=1)
+    image = form.get("image")
+    if not isinstance(image, StarletteUploadFile):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Send the image in the 'image' field")
+    image_path = await ImageSaver.save_upload(image)
+    background_tasks.add_task(ImageSaver.save_user_image, current_user.id, image_path)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"detail": "Image upload accepted"},
+    )
@@ -9,4 +9,3 @@ class UserRegistrationSchema(BaseModel):
     password: constr(min_length=8)
     first_name: Optional[str] = None
     last_name: Optional[str] = None
-    uploaded_image: Optional[str] = None
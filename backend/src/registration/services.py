@@ -1,7 +1,20 @@
+import asyncio
 import logging
+import mimetypes
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
 
+import aiofiles
 from auth.models import User
 from auth.utils import generate_password_hash
+from boto3.s3.transfer import TransferConfig
+from core.config import ProductionSettings, settings
+from database.core import AsyncSessionLocal
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .schemas import UserRegistrationSchema
@@ -10,28 +23,251 @@ logger = logging.getLogger(__name__)
 
 
 DEFAULT_CHUNK_SIZE = 1024 * 1024 * 1  # 1 megabyte (1Mb)
+# Room for the multipart boundaries and the other registration fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UserAlreadyExistsError(Exception):
+    """Raised when a registration collides with an existing email and/or username."""
+
+    def __init__(self, fields: list[str]):
+        self.fields = fields
+        super().__init__(f"User with provided {' / '.join(fields)} already exists")
+
+
+async def get_conflicting_fields(
+    db_session: AsyncSession, *, email: str, username: str
+) -> list[str]:
+    """Works out which of the unique fields are already taken."""
+    email, username = email.lower(), username.lower()
+    # Deleted users only clash through the exact unique constraints, active
+    # ones case-insensitively through the partial lower() indexes
+    query = select(func.lower(User.email), func.lower(User.username)).where(
+        or_(
+            User.email == email,
+            User.username == username,
+            and_(
+                or_(func.lower(User.email) == email, func.lower(User.username) == username),
+                User.is_deleted.is_(False),
+            ),
+        )
+    )
+    result = await db_session.execute(query)
+    fields = set()
+    for existing_email, existing_username in result.all():
+        if existing_email == email:
+            fields.add("email")
+        if existing_username == username:
+            fields.add("username")
+    return sorted(fields)
+
+
+def _insert_user_statement(dialect_name: str):
+    """INSERT skipping conflicting rows, other dialects raise IntegrityError instead."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(User)
+    return dialect_insert(User).on_conflict_do_nothing()
 
 
 async def create_user(
     db_session: AsyncSession, *, user_schema: UserRegistrationSchema
 ) -> User:
+    """Inserts the user in one round trip, relying on the unique constraints.
+
+    Raises UserAlreadyExistsError when the email or username is taken, which
+    also covers concurrent signups racing for the same values.
+    """
     hashed_password = await generate_password_hash(user_schema.password)
-    new_user = User(
-        username=user_schema.username.lower(),
-        email=user_schema.email.lower(),
-        first_name=user_schema.first_name,
-        last_name=user_schema.last_name,
-        password=hashed_password,
+    email, username = user_schema.email.lower(), user_schema.username.lower()
+    statement = (
+        _insert_user_statement(db_session.get_bind().dialect.name)
+        .values(
+            username=username,
+            email=email,
+            first_name=user_schema.first_name,
+            last_name=user_schema.last_name,
+            password=hashed_password,
+        )
+        .returning(User)
     )
 
-    db_session.add(new_user)
-    await db_session.commit()
-    await db_session.refresh(new_user)
+    try:
+        result = await db_session.execute(statement)
+        new_user = result.scalar_one_or_none()
+    except IntegrityError:
+        new_user = None
+    if new_user is None:
+        await db_session.rollback()
+        fields = await get_conflicting_fields(
+            db_session, email=email, username=username
+        )
+        raise UserAlreadyExistsError(fields or ["email", "username"])
 
+    await db_session.commit()
     return new_user
 
 
+ALLOWED_IMAGE_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+_image_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_image_process_pool() -> ProcessPoolExecutor:
+    global _image_process_pool
+    if _image_process_pool is None:
+        _image_process_pool = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESSING_WORKERS
+        )
+    return _image_process_pool
+
+
+def shutdown_image_process_pool() -> None:
+    global _image_process_pool
+    if _image_process_pool is not None:
+        _image_process_pool.shutdown(wait=False, cancel_futures=True)
+        _image_process_pool = None
+
+
+def create_thumbnail(image_path: str, size: int) -> Optional[str]:
+    """Writes a ``size`` x ``size`` bounded thumbnail next to the image, runs in a worker process."""
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning("Pillow is not installed, skipping thumbnail generation")
+        return None
+
+    source = Path(image_path)
+    thumbnail_path = source.with_name(f"{source.stem}_thumb{source.suffix}")
+    with Image.open(source) as image:
+        image.thumbnail((size, size))
+        image.save(thumbnail_path)
+    return str(thumbnail_path)
+
+
+def upload_to_s3(client, bucket: str, file_path: Path, key: str, content_type: str) -> str:
+    """Streams a file to S3 in DEFAULT_CHUNK_SIZE multipart chunks and returns its URL."""
+    client.upload_file(
+        str(file_path),
+        bucket,
+        key,
+        ExtraArgs={"ContentType": content_type},
+        Config=TransferConfig(
+            multipart_threshold=DEFAULT_CHUNK_SIZE * 8,
+            multipart_chunksize=DEFAULT_CHUNK_SIZE * 8,
+            io_chunksize=DEFAULT_CHUNK_SIZE,
+        ),
+    )
+    return f"https://{bucket}.s3.amazonaws.com/{key}"
+
+
+def raise_if_upload_too_large(content_length: Optional[str]) -> None:
+    """Rejects an upload from its Content-Length, before any of the body is read."""
+    if content_length is None:
+        raise HTTPException(
+            status_code=status.HTTP_411_LENGTH_REQUIRED,
+            detail="Uploads must send a Content-Length",
+        )
+    try:
+        size = int(content_length)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Content-Length")
+    if size > settings.USER_IMAGE_MAX_SIZE + MULTIPART_OVERHEAD:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Image is larger than {settings.USER_IMAGE_MAX_SIZE // (1024 * 1024)}MB",
+        )
+
+
 class ImageSaver:
     @classmethod
-    def save_user_image(cls, user, uploaded_image):
-        pass
+    async def save_upload(cls, upload: UploadFile) -> Path:
+        """Streams an uploaded image to disk in DEFAULT_CHUNK_SIZE chunks.
+
+        The file is never held in memory as a whole, oversized uploads are
+        aborted as soon as they cross ``USER_IMAGE_MAX_SIZE``.
+        """
+        extension = ALLOWED_IMAGE_TYPES.get(upload.content_type or "")
+        if extension is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported image type, use one of: {', '.join(ALLOWED_IMAGE_TYPES)}",
+            )
+
+        directory = Path(settings.USER_IMAGE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        image_path = directory / f"{uuid4().hex}{extension}"
+
+        size = 0
+        try:
+            async with aiofiles.open(image_path, "wb") as image_file:
+                while chunk := await upload.read(DEFAULT_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > settings.USER_IMAGE_MAX_SIZE:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Image is larger than {settings.USER_IMAGE_MAX_SIZE // (1024 * 1024)}MB",
+                        )
+                    await image_file.write(chunk)
+        except BaseException:
+            image_path.unlink(missing_ok=True)
+            raise
+        finally:
+            await upload.close()
+
+        return image_path
+
+    @classmethod
+    async def save_user_image(cls, user_id: int, image_path: Path) -> None:
+        """Generates the thumbnail, uploads to S3 when configured and stores the URL on the user."""
+        thumbnail: Optional[str] = None
+        try:
+            loop = asyncio.get_running_loop()
+            thumbnail = await loop.run_in_executor(
+                get_image_process_pool(),
+                create_thumbnail,
+                str(image_path),
+                settings.USER_IMAGE_THUMBNAIL_SIZE,
+            )
+            # The thumbnail is what gets shown as the avatar
+            avatar_path = Path(thumbnail) if thumbnail else image_path
+
+            s3_client = ProductionSettings.get_aws_client_for_image_upload()
+            bucket = getattr(settings, "AWS_IMAGES_BUCKET", "")
+            if s3_client and bucket:
+                content_type = mimetypes.guess_type(avatar_path.name)[0] or "application/octet-stream"
+                urls = {}
+                for file_path in {image_path, avatar_path}:
+                    urls[file_path] = await asyncio.to_thread(
+                        upload_to_s3,
+                        s3_client,
+                        bucket,
+                        file_path,
+                        f"users/{user_id}/{file_path.name}",
+                        content_type,
+                    )
+                    file_path.unlink(missing_ok=True)
+                image_url = urls[avatar_path]
+            else:
+                image_url = "/static/" + avatar_path.relative_to(settings.STATIC_DIR).as_posix()
+
+            async with AsyncSessionLocal() as db_session:
+                await db_session.execute(
+                    update(User).where(User.id == user_id).values(user_image=image_url)
+                )
+                await db_session.commit()
+            logger.info(f"Saved image for user {user_id}")
+        except Exception as e:
+            logger.error(f"Error saving image for user {user_id}: {e}", exc_info=True)
+            # Nothing points at the files, do not leave them behind
+            image_path.unlink(missing_ok=True)
+            if thumbnail:
+                Path(thumbnail).unlink(missing_ok=True)
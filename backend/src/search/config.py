@@ -0,0 +1,19 @@
+from pydantic_settings import BaseSettings
+
+
+class SearchSettings(BaseSettings):
+
+    #################################### search ####################################
+    # Postgres text search configuration used for the tsvector columns and queries
+    SEARCH_LANGUAGE: str = "english"
+    SEARCH_DEFAULT_LIMIT: int = 20
+    SEARCH_MAX_LIMIT: int = 100
+    # Deep offsets get expensive, clients should refine the query instead
+    SEARCH_MAX_OFFSET: int = 1_000
+    # Minimum trigram similarity for a word to count as a typo match in the
+    # in-memory index, Postgres uses pg_trgm.similarity_threshold instead
+    SEARCH_TRIGRAM_THRESHOLD: float = 0.3
+    #################################### search ####################################
+
+
+search_settings = SearchSettings()
@@ -0,0 +1,85 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Hashable, Iterable, Optional
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def trigrams(token: str) -> set[str]:
+    """Returns the trigrams of a token padded the way pg_trgm pads words."""
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(left: str, right: str) -> float:
+    """Trigram similarity between two tokens, matching pg_trgm's ``similarity``."""
+    left_trigrams, right_trigrams = trigrams(left), trigrams(right)
+    union = len(left_trigrams | right_trigrams)
+    return len(left_trigrams & right_trigrams) / union if union else 0.0
+
+
+class InvertedIndex:
+    """In-memory full-text index used where Postgres text search is not available.
+
+    Documents are indexed per field with a weight, mirroring the tsvector
+    weights. Query terms without an exact match fall back to the most similar
+    indexed terms, mirroring the trigram fallback.
+    """
+
+    def __init__(self, trigram_threshold: float = 0.3):
+        self.trigram_threshold = trigram_threshold
+        # term -> {document key: weighted term frequency}
+        self._postings: dict[str, dict[Hashable, float]] = defaultdict(dict)
+        self._documents: dict[Hashable, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, key: Hashable, fields: Iterable[tuple[Optional[str], float]]) -> None:
+        """Indexes a document given as ``(text, weight)`` pairs, replacing any previous version."""
+        self.remove(key)
+        weights: Counter = Counter()
+        for text, weight in fields:
+            for token in tokenize(text):
+                weights[token] += weight
+        for token, weight in weights.items():
+            self._postings[token][key] = weight
+        self._documents[key] = set(weights)
+
+    def remove(self, key: Hashable) -> None:
+        for token in self._documents.pop(key, ()):
+            postings = self._postings[token]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        """Returns the indexed terms a query token matches with their match quality."""
+        if token in self._postings:
+            return [(token, 1.0)]
+        candidates = [(term, similarity(token, term)) for term in self._postings]
+        return [(term, score) for term, score in candidates if score >= self.trigram_threshold]
+
+    def search(self, query: str) -> list[tuple[Hashable, float]]:
+        """Returns ``(key, score)`` pairs for documents matching every query term, best first."""
+        scores: Optional[dict[Hashable, float]] = None
+        for token in set(tokenize(query)):
+            token_scores: dict[Hashable, float] = {}
+            for term, quality in self._expand(token):
+                postings = self._postings[term]
+                # Rare terms count for more, like ts_rank's normalisation
+                idf = math.log(1 + len(self._documents) / len(postings))
+                for key, weight in postings.items():
+                    token_scores[key] = max(token_scores.get(key, 0.0), weight * quality * idf)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {key: score + token_scores[key] for key, score in scores.items() if key in token_scores}
+            if not scores:
+                return []
+        return sorted((scores or {}).items(), key=lambda item: (-item[1], str(item[0])))
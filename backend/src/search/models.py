@@ -0,0 +1,47 @@
+from organisation.models import Organisation
+from product.models import Product
+from sqlalchemy import DDL, event
+
+from .config import search_settings
+
+# Searchable tables and the weighted columns feeding their ``search_vector``
+SEARCHABLE_TABLES = {
+    Organisation.__tablename__: {"name": "A", "description": "B"},
+    Product.__tablename__: {"name": "A", "description": "B"},
+}
+
+
+def search_vector_expression(columns: dict[str, str], row: str = "NEW") -> str:
+    """Builds the weighted tsvector expression for the given ``column: weight`` pairs."""
+    return " || ".join(
+        f"setweight(to_tsvector('{search_settings.SEARCH_LANGUAGE}', coalesce({row}.{column}, '')), '{weight}')"
+        for column, weight in columns.items()
+    )
+
+
+def search_ddl_statements(table: str, columns: dict[str, str]) -> list[str]:
+    """Returns the idempotent statements adding the search column, trigger and indexes to a table."""
+    watched = ", ".join(columns)
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        f"""CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := {search_vector_expression(columns)};
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql""",
+        f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}",
+        f"""CREATE TRIGGER {table}_search_vector_trigger
+BEFORE INSERT OR UPDATE OF {watched} ON {table}
+FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()""",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_search_vector ON {table} USING gin (search_vector)",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_name_trgm ON {table} USING gin (name gin_trgm_ops)",
+    ]
+
+
+# Fresh Postgres databases get the search columns with the tables,
+# existing ones through the alembic migration
+for model in (Organisation, Product):
+    for statement in search_ddl_statements(model.__tablename__, SEARCHABLE_TABLES[model.__tablename__]):
+        event.listen(model.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,35 @@
+import logging
+from typing import List, Optional
+
+from core.cache import response_cache
+from core.enums import SearchTypes
+from database.core import get_async_read_db
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import search_settings
+from .schemas import SearchResponse
+from .services import search
+
+logger = logging.getLogger(__name__)
+
+search_router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@search_router.get("", response_model=SearchResponse, name="search")
+async def search_all(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for, typos are tolerated"),
+    types: Optional[List[SearchTypes]] = Query(None, description="Restrict the search to these types"),
+    limit: int = Query(search_settings.SEARCH_DEFAULT_LIMIT, ge=1, le=search_settings.SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    db_session: AsyncSession = Depends(get_async_read_db),
+):
+    """Ranked search over organisations and products."""
+
+    async def build():
+        return await search(db_session=db_session, query=q, types=types, limit=limit, offset=offset)
+
+    return await response_cache.respond(
+        request, namespace="search", tags=["organisations", "products"], build=build
+    )
@@ -0,0 +1,16 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchResult(BaseModel):
+    type: str
+    id: int
+    name: str
+    description: Optional[str] = Field(None)
+    score: float
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    next_offset: Optional[int] = Field(None)
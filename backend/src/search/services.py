@@ -0,0 +1,164 @@
+import logging
+from typing import List, Optional
+
+from core.enums import SearchTypes
+from fastapi import HTTPException, status
+from organisation.models import Organisation
+from product.models import Product
+from sqlalchemy import and_, event, func, literal, literal_column, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import search_settings
+from .index import InvertedIndex
+from .models import SEARCHABLE_TABLES
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODELS = {
+    SearchTypes.organisation: Organisation,
+    SearchTypes.product: Product,
+}
+
+
+def visible(model):
+    """Filters the rows of a searchable model that may show up in results."""
+    if model is Organisation:
+        return and_(Organisation.active.is_(True), Organisation.is_deleted.is_(False))
+    return model.is_deleted.is_(False)
+
+
+class FallbackSearchIndex:
+    """Lazily built :class:`InvertedIndex` over every searchable row, for databases without text search.
+
+    Any write to a searchable model drops it, the next search rebuilds it.
+    """
+
+    def __init__(self):
+        self._index: Optional[InvertedIndex] = None
+
+    def invalidate(self) -> None:
+        self._index = None
+
+    async def get(self, db_session: AsyncSession) -> InvertedIndex:
+        if self._index is None:
+            index = InvertedIndex(trigram_threshold=search_settings.SEARCH_TRIGRAM_THRESHOLD)
+            weights = {"A": 1.0, "B": 0.4}
+            for search_type, model in SEARCH_MODELS.items():
+                columns = SEARCHABLE_TABLES[model.__tablename__]
+                result = await db_session.execute(
+                    select(model.id, *(getattr(model, column) for column in columns)).where(visible(model))
+                )
+                for row_id, *values in result.all():
+                    fields = zip(values, (weights[weight] for weight in columns.values()))
+                    index.add((search_type, row_id), fields)
+            self._index = index
+        return self._index
+
+
+fallback_search_index = FallbackSearchIndex()
+
+
+def _invalidate_fallback_index(mapper, connection, target) -> None:
+    fallback_search_index.invalidate()
+
+
+for model in SEARCH_MODELS.values():
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, event_name, _invalidate_fallback_index)
+
+
+def _postgres_query(search_type: SearchTypes, query: str):
+    model = SEARCH_MODELS[search_type]
+    # Maintained by the search triggers, not mapped on the model
+    search_vector = literal_column(f"{model.__tablename__}.search_vector")
+    ts_query = func.websearch_to_tsquery(search_settings.SEARCH_LANGUAGE, query)
+    # Trigram similarity on the name catches typos the stemmed tsquery misses
+    score = func.ts_rank_cd(search_vector, ts_query) + func.similarity(model.name, query)
+    return select(
+        literal(search_type.value).label("type"),
+        model.id.label("id"),
+        model.name.label("name"),
+        model.description.label("description"),
+        score.label("score"),
+    ).where(visible(model), or_(search_vector.op("@@")(ts_query), model.name.op("%")(query)))
+
+
+async def _search_postgres(
+    *, db_session: AsyncSession, query: str, types: List[SearchTypes], limit: int, offset: int
+) -> List[dict]:
+    results = union_all(*(_postgres_query(search_type, query) for search_type in types)).subquery()
+    statement = (
+        select(results)
+        .order_by(results.c.score.desc(), results.c.type, results.c.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    return [dict(row) for row in (await db_session.execute(statement)).mappings().all()]
+
+
+async def _search_fallback(
+    *, db_session: AsyncSession, query: str, types: List[SearchTypes], limit: int, offset: int
+) -> List[dict]:
+    index = await fallback_search_index.get(db_session)
+    matches = [(key, score) for key, score in index.search(query) if key[0] in types]
+    page = matches[offset : offset + limit]
+
+    results = []
+    for search_type in types:
+        ids = [row_id for (match_type, row_id), _ in page if match_type == search_type]
+        if not ids:
+            continue
+        model = SEARCH_MODELS[search_type]
+        rows = await db_session.execute(
+            select(model.id, model.name, model.description).where(model.id.in_(ids))
+        )
+        results.extend(
+            {"type": search_type.value, "id": row.id, "name": row.name, "description": row.description}
+            for row in rows.all()
+        )
+    found = {(result["type"], result["id"]): result for result in results}
+    return [
+        {**found[(search_type.value, row_id)], "score": score}
+        for (search_type, row_id), score in page
+        if (search_type.value, row_id) in found
+    ]
+
+
+async def search(
+    *,
+    db_session: AsyncSession,
+    query: str,
+    types: Optional[List[SearchTypes]] = None,
+    limit: int = search_settings.SEARCH_DEFAULT_LIMIT,
+    offset: int = 0,
+) -> dict:
+    """Searches organisations and products, best matches first.
+
+    Uses the tsvector and trigram indexes on Postgres and the in-memory
+    inverted index elsewhere. One extra row is fetched to tell whether there
+    is a next page without counting every match.
+    """
+    types = types or list(SEARCH_MODELS)
+    unsupported = [search_type.value for search_type in types if search_type not in SEARCH_MODELS]
+    if unsupported:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Searching {', '.join(unsupported)} is not supported",
+        )
+    if offset > search_settings.SEARCH_MAX_OFFSET:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"offset can be at most {search_settings.SEARCH_MAX_OFFSET}, refine the query instead",
+        )
+
+    if db_session.get_bind().dialect.name == "postgresql":
+        search_backend = _search_postgres
+    else:
+        search_backend = _search_fallback
+    results = await search_backend(
+        db_session=db_session, query=query, types=types, limit=limit + 1, offset=offset
+    )
+    return {
+        "results": results[:limit],
+        "next_offset": offset + limit if len(results) > limit else None,
+    }
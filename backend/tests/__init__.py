@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The application imports its packages from src, as when run from there
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,67 @@
+import json
+import unittest
+
+from auth.services import select_user_by_login_identifier
+from database.core import async_engine
+from organisation.models import Organisation
+from organisation.services import filter_active_and_not_deleted
+from sqlalchemy import func, select, text
+
+
+def used_indexes(plan: dict) -> set[str]:
+    indexes = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        indexes |= used_indexes(child)
+    return indexes
+
+
+class HotQueryIndexesTest(unittest.IsolatedAsyncioTestCase):
+    """The login and organisation list queries must be able to use their partial indexes.
+
+    Needs the configured Postgres database at ``alembic upgrade head``.
+    Sequential scans are disabled so that small development tables still show
+    whether an index is usable.
+    """
+
+    async def asyncSetUp(self):
+        if async_engine.dialect.name != "postgresql":
+            self.skipTest("the partial indexes only exist on Postgres")
+        try:
+            self.connection = await async_engine.connect()
+        except OSError as e:
+            self.skipTest(f"Postgres is not reachable: {e}")
+        await self.connection.execute(text("SET enable_seqscan = off"))
+
+    async def asyncTearDown(self):
+        await self.connection.close()
+        await async_engine.dispose()
+
+    async def assert_uses_indexes(self, statement, expected: set[str]) -> None:
+        compiled = statement.compile(async_engine, compile_kwargs={"literal_binds": True})
+        result = await self.connection.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = result.scalar_one()
+        plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+        self.assertLessEqual(expected, used_indexes(plan), json.dumps(plan, indent=2))
+
+    async def test_login_by_email_or_username(self):
+        await self.assert_uses_indexes(
+            select_user_by_login_identifier("someone@example.com"),
+            {"uq_users_email_lower", "uq_users_username_lower"},
+        )
+
+    async def test_organisations_page(self):
+        statement = (
+            (await filter_active_and_not_deleted(select(Organisation)))
+            .where(Organisation.id > 100)
+            .order_by(Organisation.id)
+            .limit(50)
+        )
+        await self.assert_uses_indexes(statement, {"idx_organisations_active_id"})
+
+    async def test_organisations_count(self):
+        statement = await filter_active_and_not_deleted(select(func.count(Organisation.id)))
+        await self.assert_uses_indexes(statement, {"idx_organisations_active_id"})
+
+
+if __name__ == "__main__":
+    unittest.main()
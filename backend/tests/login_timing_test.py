@@ -0,0 +1,41 @@
+import statistics
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from auth.hashing import hash_password
+from auth.models import User
+from auth.services import authenticate_user
+
+SAMPLES = 9
+
+
+class LoginTimingTest(unittest.IsolatedAsyncioTestCase):
+    """A wrong password must take as long as an unknown user, or logins enumerate accounts."""
+
+    async def asyncSetUp(self):
+        self.user = User(username="existing", email="existing@example.com", password=await hash_password("right"))
+
+    async def time_login(self, user) -> list[float]:
+        timings = []
+        with patch("auth.services.get_user_by_login_identifier", AsyncMock(return_value=user)):
+            for _ in range(SAMPLES):
+                started = time.perf_counter()
+                self.assertIsNone(await authenticate_user(None, login_identifier="someone", password="wrong"))
+                timings.append(time.perf_counter() - started)
+        return timings
+
+    async def test_unknown_user_takes_as_long_as_a_wrong_password(self):
+        # Warm up the hashing pool and the decoy hash
+        await self.time_login(None)
+        wrong_password = statistics.median(await self.time_login(self.user))
+        unknown_user = statistics.median(await self.time_login(None))
+        self.assertLess(
+            abs(wrong_password - unknown_user) / wrong_password,
+            0.25,
+            f"wrong password {wrong_password * 1000:.1f} ms, unknown user {unknown_user * 1000:.1f} ms",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()